@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from matplotlib import colormaps, colors
 import utils
 import base64
 import os
@@ -368,10 +370,198 @@ def load_css():
     </script>
     """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data_cached():
-    """Carrega dados com cache"""
-    return utils.load_data()
+@st.cache_resource
+def load_dataset_cached():
+    """Abre a base de dados com carga de colunas sob demanda (compartilhada entre sessões)"""
+    return utils.LazyDataset()
+
+@st.cache_resource
+def metrics_memo():
+    """Cache LRU/TTL das métricas por combinação de filtros (compartilhado entre sessões)"""
+    return utils.MetricsMemo(maxsize=64, ttl=600)
+
+@st.cache_resource
+def selection_memo():
+    """Cache LRU/TTL dos resultados por busca ou seleção (rankings, área detalhada)
+    
+    Separado de metrics_memo() para que cada texto digitado na busca não
+    descarte o cubo e as máscaras de linhas, que são caros de refazer.
+    """
+    return utils.MetricsMemo(maxsize=32, ttl=600)
+
+def memoized(nome, filtros, func, memo=None):
+    """Resultado de func() guardado por (versão da base, nome, filtros)
+    
+    Sem filtros (None) o cálculo é feito diretamente, sem cache. memo é o
+    MetricsMemo usado (por padrão, metrics_memo()).
+    """
+    if filtros is None:
+        return func()
+    chave = (load_dataset_cached().version, nome, utils.filter_key(**filtros))
+    return (memo or metrics_memo()).get_or_compute(chave, func)
+
+@st.cache_resource
+def figure_cache():
+    """Cache LRU/TTL das figuras Plotly montadas (compartilhado entre sessões)"""
+    return utils.MetricsMemo(maxsize=64, ttl=3600)
+
+@st.cache_resource
+def table_cache():
+    """Cache LRU/TTL da ordem das linhas e dos níveis de cor das tabelas paginadas"""
+    return utils.MetricsMemo(maxsize=32, ttl=600)
+
+def cached_figure(nome, dados, build, params=()):
+    """Figura de build() guardada por (nome, conteúdo de dados, params)
+    
+    dados são os agregados desenhados pela figura e params os parâmetros do
+    gráfico que não estão em dados. Reruns e sessões com os mesmos dados
+    pulam a montagem, a validação da figura e o apply_shadcn_style. A mesma
+    figura é devolvida a todas as sessões, então não deve ser alterada.
+    """
+    chave = (nome, utils.frame_fingerprint(dados), params)
+    return figure_cache().get_or_compute(chave, build)
+
+# Máximo de pontos por curva nos gráficos de séries temporais (redução por LTTB)
+POINT_BUDGET = 2000
+# A partir deste número de pontos a curva é desenhada com WebGL (Scattergl)
+WEBGL_THRESHOLD = 1000
+
+def series_trace(serie, y, **kwargs):
+    """Traço de serie['Data'] x serie[y] com no máximo POINT_BUDGET pontos
+    
+    Séries maiores são reduzidas por utils.lttb; curvas com mais de
+    WEBGL_THRESHOLD pontos usam Scattergl em vez de SVG.
+    """
+    pontos = utils.downsample(serie, 'Data', y, POINT_BUDGET)
+    trace = go.Scattergl if len(pontos) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=pontos['Data'], y=pontos[y], **kwargs)
+
+# Tabelas paginadas: linhas por página, colunas com gradiente e níveis de cor
+TABLE_PAGE_SIZE = 50
+GRADIENT_COLUMNS = ['Taxa_Presenca', 'Media_Participacao', 'Taxa_Pesquisa']
+GRADIENT_BINS = 20
+
+@st.cache_resource
+def gradient_styles(cmap='RdYlGn', bins=GRADIENT_BINS):
+    """CSS de cada nível de cor, no mesmo formato do Styler.background_gradient"""
+    estilos = []
+    for i in range(bins):
+        rgba = colormaps[cmap](i / (bins - 1))
+        # Texto claro sobre fundos escuros (luminância relativa, como no pandas)
+        r, g, b = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in rgba[:3]]
+        escuro = 0.2126 * r + 0.7152 * g + 0.0722 * b < 0.408
+        estilos.append(f"background-color: {colors.rgb2hex(rgba)};color: {'#f1f1f1' if escuro else '#000000'};")
+    return estilos
+
+def paged_table(df, key, sort_by, ascending=False, gradient=GRADIENT_COLUMNS, page_size=TABLE_PAGE_SIZE):
+    """Tabela com ordenação e paginação no servidor
+    
+    Os níveis de cor das colunas de gradient (utils.color_bins) e a ordem das
+    linhas são calculados uma vez por (key, conteúdo da tabela, ordenação) e
+    guardados em table_cache(); trocar de página só fatia esse resultado. Só as
+    linhas da página visível recebem CSS e são enviadas ao navegador. key
+    distingue os controles de cada tabela.
+    """
+    colunas = df.columns.tolist()
+    paginas = max(1, -(-len(df) // page_size))
+    chave_pagina = f"{key}_pagina"
+    # Nova ordenação recomeça da primeira página
+    primeira_pagina = lambda: st.session_state.update({chave_pagina: 1})
+    # Valores iniciais pelo session_state (as chaves são mantidas por keep_tab_widgets)
+    if st.session_state.get(f"{key}_ordem") not in colunas:
+        st.session_state[f"{key}_ordem"] = sort_by
+    st.session_state.setdefault(f"{key}_crescente", ascending)
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        ordem = st.selectbox("Ordenar por:", colunas, key=f"{key}_ordem", on_change=primeira_pagina)
+    with col2:
+        crescente = st.toggle("Ordem crescente", key=f"{key}_crescente", on_change=primeira_pagina)
+    with col3:
+        # Página fora do intervalo (a tabela encolheu com os filtros) volta para a última
+        if st.session_state.get(chave_pagina, 1) > paginas:
+            st.session_state[chave_pagina] = paginas
+        pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+    
+    gradient = [col for col in gradient if col in colunas]
+    
+    def ordenar():
+        ordenado = df[ordem].reset_index(drop=True).sort_values(ascending=crescente, kind='stable')
+        niveis = {col: utils.color_bins(df[col], GRADIENT_BINS) for col in gradient}
+        return ordenado.index.to_numpy(), niveis
+    
+    # Trocar de página só fatia a ordem e os níveis guardados
+    chave = (key, utils.frame_fingerprint(df), ordem, crescente, tuple(gradient))
+    posicoes, niveis = table_cache().get_or_compute(chave, ordenar)
+    inicio = (pagina - 1) * page_size
+    pagina_posicoes = posicoes[inicio:inicio + page_size]
+    visivel = df.iloc[pagina_posicoes]
+    
+    estilos_nivel = np.array([''] + gradient_styles(), dtype=object)
+    estilos = pd.DataFrame('', index=visivel.index, columns=visivel.columns)
+    for col in gradient:
+        # Nível -1 (nulo) fica sem cor
+        estilos[col] = estilos_nivel[niveis[col][pagina_posicoes] + 1]
+    
+    st.dataframe(visivel.style.apply(lambda _: estilos, axis=None), use_container_width=True, hide_index=True)
+    if paginas > 1:
+        st.caption(f"Linhas {inicio + 1}–{inicio + len(visivel)} de {len(df)}")
+
+# Colunas usadas por cada aba (os filtros da sidebar usam o FilterIndex; resumo,
+# diretores, cursos e série temporal vêm do cubo de métricas)
+TAB_COLUMNS = {
+    'panorama': ['Presente', '% Participação', 'Status'],
+    'area': utils.columns_for('get_individual_metrics'),
+    'participante': utils.columns_for('get_individual_metrics',
+                                      extra=['Data', 'Curso', 'Status', '% Participação',
+                                             'Respondeu a Pesquisa de Satisfação?', '% Câmera aberta'])
+}
+
+# Máximo de nomes enviados ao seletor de participante a cada rerun
+PARTICIPANT_OPTIONS = 100
+
+def drill_down(dataset, linhas, col, valor, colunas):
+    """Linhas filtradas de um participante ou diretor pelo índice de grupos
+    
+    O custo é o tamanho do histórico do valor, não o tamanho da base.
+    """
+    posicoes = dataset.group_index().rows(col, valor)
+    return dataset.get(colunas, rows=posicoes[linhas[posicoes]])
+
+def lazy_tabs(labels, key):
+    """Abas que rastreiam a aba ativa, para que só ela seja executada
+    
+    Trocar de aba gera um rerun; em versões do Streamlit sem esse recurso as
+    abas se comportam como st.tabs comum e todas são executadas.
+    """
+    try:
+        return st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        return st.tabs(labels)
+
+def tab_open(tab):
+    """Indica se o conteúdo da aba deve ser executado neste rerun"""
+    return getattr(tab, 'open', None) is not False
+
+# Widgets dentro das abas; seus valores são mantidos enquanto a aba está fechada
+TAB_WIDGET_KEYS = ["diretor_detalhe", "busca_participante", "diretor_participante",
+                   "participante_selecionado", "cursos_sessao"] + [
+    f"{tabela}_{controle}" for tabela in ["tabela_diretores", "tabela_participantes", "tabela_temporal", "tabela_sessoes"]
+    for controle in ["ordem", "crescente", "pagina"]]
+
+def keep_tab_widgets():
+    """Preserva a seleção dos widgets das abas que não são executadas neste rerun
+    
+    O Streamlit descarta o estado de widgets que não aparecem em um rerun;
+    reatribuir o valor no session_state mantém a seleção até a aba reabrir.
+    """
+    for key in TAB_WIDGET_KEYS:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+# Seções de detalhamento rodam como fragmentos (st.fragment): uma interação
+# nelas refaz só a seção, sem recarregar sidebar, filtros e demais abas.
+# Em versões do Streamlit sem fragmentos, a seção roda junto com a página.
+drill_down_fragment = getattr(st, "fragment", lambda func: func)
 
 def validate_csv(df):
     """Valida se o DataFrame tem as colunas necessárias"""
@@ -383,21 +573,18 @@ def validate_csv(df):
     missing_columns = [col for col in required_columns if col not in df.columns]
     return len(missing_columns) == 0, missing_columns
 
-def handle_file_upload(uploaded_file):
-    """Processa o upload do arquivo CSV"""
+@st.cache_data(max_entries=4, show_spinner=False)
+def parse_uploaded_file(file_id, _data):
+    """Lê o arquivo enviado uma única vez por upload (memoizado pelo file_id)"""
+    return utils.read_csv_bytes(_data)
+
+def handle_file_upload(df, replace=False):
+    """Processa o upload do arquivo CSV já lido por parse_uploaded_file
+    
+    Por padrão os registros são acrescentados à base existente; com
+    replace=True o arquivo substitui a base inteira.
+    """
     try:
-        # Tentar ler o arquivo CSV com diferentes encodings
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                uploaded_file.seek(0)  # Resetar o ponteiro do arquivo
-                df = pd.read_csv(uploaded_file, sep=';', encoding=encoding)
-                break
-            except (UnicodeDecodeError, pd.errors.ParserError):
-                continue
-        
         if df is None:
             return False, "Não foi possível ler o arquivo. Verifique o formato e encoding."
         
@@ -410,12 +597,26 @@ def handle_file_upload(uploaded_file):
         if len(df) == 0:
             return False, "O arquivo CSV está vazio."
         
+        csv_path = utils.find_data_file()
+        
+        if not replace and os.path.exists(csv_path):
+            # Processar apenas as linhas novas e anexá-las à base existente
+            resultado = utils.append_records(csv_path, df)
+            load_dataset_cached.clear()
+            metrics_memo().clear()
+            selection_memo().clear()
+            
+            return True, (f"Base atualizada com sucesso! {resultado['novos']} registros novos "
+                          f"({resultado['atualizados']} atualizados). Total: {resultado['total']} registros.")
+        
         # Salvar o arquivo
-        csv_path = 'Base_Dados_Cursos.csv'
         df.to_csv(csv_path, sep=';', index=False, encoding='utf-8')
         
-        # Limpar o cache
-        load_data_cached.clear()
+        # Limpar o cache (em memória e Parquet em disco)
+        utils.invalidate_parsed_cache(csv_path)
+        load_dataset_cached.clear()
+        metrics_memo().clear()
+        selection_memo().clear()
         
         return True, f"Arquivo atualizado com sucesso! {len(df)} registros carregados."
     
@@ -574,11 +775,11 @@ def main():
     ''', unsafe_allow_html=True)
     
     
-    # Carregar dados
-    df = load_data_cached()
+    # Carregar dados (as colunas são lidas sob demanda por cada aba)
+    dataset = load_dataset_cached()
     
-    # Verificar se o DataFrame está vazio (arquivo não encontrado)
-    if df.empty:
+    # Verificar se a base está vazia (arquivo não encontrado)
+    if dataset.empty:
         st.warning("""
         ⚠️ **Arquivo de dados não encontrado!**
         
@@ -602,10 +803,14 @@ def main():
     # Sidebar - Filtros
     st.sidebar.markdown(f'<div style="font-size: 1.2rem; font-weight: 600; color: {CORES["verde_escuro"]};">{icon_html("search", 20, CORES["verde_escuro"])} Filtros</div>', unsafe_allow_html=True)
     
+    # As opções dos filtros saem do cubo Data x Curso x Diretor, sem varrer as linhas
+    cubo = dataset.cube()
+    filtros = {}
+    
     # Filtro de data
-    if not df['Data'].isna().all():
-        min_date = df['Data'].min()
-        max_date = df['Data'].max()
+    if not cubo.cells['Data'].isna().all():
+        min_date = cubo.cells['Data'].min()
+        max_date = cubo.cells['Data'].max()
         date_range = st.sidebar.date_input(
             "Período",
             value=(min_date, max_date),
@@ -614,20 +819,18 @@ def main():
         )
         
         if len(date_range) == 2:
-            df = df[(df['Data'] >= pd.Timestamp(date_range[0])) & 
-                   (df['Data'] <= pd.Timestamp(date_range[1]))]
-    
-    # Filtro de curso
-    cursos = ['Todos'] + sorted(df['Curso'].unique().tolist())
-    curso_selecionado = st.sidebar.selectbox("Curso", cursos)
-    if curso_selecionado != 'Todos':
-        df = df[df['Curso'] == curso_selecionado]
-    
-    # Filtro de diretor
-    diretores = ['Todos'] + sorted(df['Diretor'].unique().tolist())
-    diretor_selecionado = st.sidebar.selectbox("Diretor/Área", diretores)
-    if diretor_selecionado != 'Todos':
-        df = df[df['Diretor'] == diretor_selecionado]
+            filtros['date_range'] = date_range
+    
+    # Filtros de curso, diretor e status: vários valores, para incluir ou excluir
+    for arg, label in (('cursos', 'Curso'), ('diretores', 'Diretor/Área'), ('status', 'Status')):
+        opcoes = cubo.options(utils.FILTER_COLUMNS[arg], **filtros)
+        selecionados = st.sidebar.multiselect(label, opcoes, placeholder="Todos")
+        if not selecionados:
+            continue
+        if st.sidebar.checkbox(f"Excluir {label.lower()} selecionados", key=f"excluir_{arg}"):
+            filtros.setdefault('exclude', {})[arg] = selecionados
+        else:
+            filtros[arg] = selecionados
     
     # Sidebar - Upload de arquivo
     st.sidebar.markdown("---")
@@ -644,28 +847,30 @@ def main():
         # Mostrar informações do arquivo
         st.sidebar.info(f"📄 Arquivo selecionado: {uploaded_file.name}")
         
+        # Leitura única do arquivo: pré-visualização, validação e carga usam o mesmo DataFrame
+        upload_df, _ = parse_uploaded_file(uploaded_file.file_id, uploaded_file.getvalue())
+        
         # Pré-visualização do arquivo
-        try:
-            uploaded_file.seek(0)
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            preview_df = None
-            for encoding in encodings:
-                try:
-                    uploaded_file.seek(0)
-                    preview_df = pd.read_csv(uploaded_file, sep=';', encoding=encoding, nrows=5)
-                    break
-                except:
-                    continue
-            if preview_df is not None:
-                with st.sidebar.expander("👁️ Pré-visualizar arquivo (primeiras 5 linhas)"):
-                    st.dataframe(preview_df, use_container_width=True, hide_index=True)
-        except:
-            pass
+        if upload_df is not None:
+            with st.sidebar.expander("👁️ Pré-visualizar arquivo (primeiras 5 linhas)"):
+                st.dataframe(upload_df.head(5), use_container_width=True, hide_index=True)
+            
+            is_valid, missing_cols = validate_csv(upload_df)
+            if not is_valid:
+                st.sidebar.warning(f"Colunas ausentes no arquivo: {', '.join(missing_cols)}")
+        else:
+            st.sidebar.error("Não foi possível ler o arquivo. Verifique o formato e encoding.")
+        
+        substituir_base = st.sidebar.checkbox(
+            "Substituir a base inteira",
+            value=False,
+            help="Por padrão os registros do arquivo são acrescentados à base atual; registros já existentes (mesma data, participante e curso) são atualizados."
+        )
         
         if st.sidebar.button("✅ Atualizar Base de Dados", type="primary", use_container_width=True):
             with st.sidebar:
                 with st.spinner("Processando arquivo..."):
-                    success, message = handle_file_upload(uploaded_file)
+                    success, message = handle_file_upload(upload_df, replace=substituir_base)
                     
                     if success:
                         st.success(message)
@@ -675,24 +880,39 @@ def main():
                         st.error(message)
     
     # Abas principais - Streamlit não suporta HTML nas abas, então usamos texto simples
-    tab1, tab2, tab3, tab4 = st.tabs([
+    keep_tab_widgets()
+    tab1, tab2, tab3, tab4 = lazy_tabs([
         "Panorama Geral",
         "Por Área/Diretor",
         "Por Participante",
         "Evolução Temporal"
-    ])
+    ], key="aba_ativa")
     
+    # Métricas agregadas respondidas pelo cubo; só as abas que precisam das linhas as filtram.
+    # Ambos ficam em cache por combinação de filtros, então reruns não recalculam nada
+    agregados = memoized('cubo', filtros, lambda: cubo.aggregate(**filtros))
+    linhas = memoized('linhas', filtros, lambda: dataset.filter_index().select(**filtros))
+    
+    # Só a aba ativa monta gráficos e tabelas; as demais rodam quando forem abertas
     with tab1:
-        show_panorama_geral(df)
+        if tab_open(tab1):
+            show_panorama_geral(dataset.get(TAB_COLUMNS['panorama'], rows=linhas), agregados, filtros)
     
     with tab2:
-        show_por_area(df)
+        if tab_open(tab2):
+            show_por_area(dataset.get(TAB_COLUMNS['area'], rows=linhas), agregados['by_director'], filtros,
+                          historico=lambda diretor: drill_down(dataset, linhas, 'Diretor', diretor, TAB_COLUMNS['area']))
     
     with tab3:
-        show_por_participante(df)
+        if tab_open(tab3):
+            show_por_participante(dataset.get(TAB_COLUMNS['participante'], rows=linhas), filtros,
+                                  historico=lambda nome: drill_down(dataset, linhas, 'Participante', nome,
+                                                                    TAB_COLUMNS['participante']),
+                                  indice_nomes=dataset.name_index())
     
     with tab4:
-        show_evolucao_temporal(df)
+        if tab_open(tab4):
+            show_evolucao_temporal(agregados['time_series'], agregados['sessions'])
     
     # Rodapé com créditos
     st.markdown("---")
@@ -703,11 +923,16 @@ def main():
         unsafe_allow_html=True
     )
 
-def generate_strategic_insights(df):
-    """Gera insights estratégicos e sugestões de ações baseados na análise dos dados"""
-    metrics = utils.get_summary_metrics(df)
-    metrics_by_course = utils.get_metrics_by_course(df)
-    metrics_by_director = utils.get_metrics_by_director(df)
+def generate_strategic_insights(df, agregados=None):
+    """Gera insights estratégicos e sugestões de ações baseados na análise dos dados
+    
+    agregados pode trazer as visões de utils.aggregate_metrics já calculadas.
+    """
+    if agregados is None:
+        agregados = utils.aggregate_metrics(df, ['summary', 'by_course', 'by_director'])
+    metrics = agregados['summary']
+    metrics_by_course = agregados['by_course']
+    metrics_by_director = agregados['by_director']
     df_presentes = df[df['Presente'] == 1]
     
     insights = []
@@ -899,12 +1124,19 @@ def generate_strategic_insights(df):
     # Garantir exatamente 5 insights e 5 ações
     return insights[:5], acoes[:5]
 
-def show_panorama_geral(df):
-    """Exibe o panorama geral dos indicadores"""
+def show_panorama_geral(df, agregados=None, filtros=None):
+    """Exibe o panorama geral dos indicadores
+    
+    agregados pode trazer as visões de resumo, cursos e diretores já calculadas
+    (por exemplo, pelo cubo de métricas); filtros identifica o recorte de df
+    no cache de métricas.
+    """
     st.markdown(f'<h2 class="section-title">Panorama Geral de Engajamento</h2>', unsafe_allow_html=True)
     
-    # Calcular métricas
-    metrics = utils.get_summary_metrics(df)
+    # Calcular métricas (resumo, cursos e diretores em uma única agregação)
+    if agregados is None:
+        agregados = utils.aggregate_metrics(df, ['summary', 'by_course', 'by_director'])
+    metrics = agregados['summary']
     
     # Cards de métricas principais
     col1, col2, col3, col4 = st.columns(4)
@@ -944,152 +1176,147 @@ def show_panorama_geral(df):
     
     with col1:
         # Distribuição de participação - Gráfico de barras estilo shadcn/ui
-        df_presentes = df[df['Presente'] == 1]
-        
-        # Criar intervalos (bins) para o gráfico de barras
-        n_bins = 20
-        min_val = df_presentes['% Participação'].min()
-        max_val = df_presentes['% Participação'].max()
-        bin_width = (max_val - min_val) / n_bins
+        # Intervalos (bins) calculados em uma única passada e guardados por filtro
+        distribuicao = memoized('distribuicao_participacao', filtros, lambda: utils.distribution(
+            df.loc[df['Presente'] == 1, '% Participação'], bins=20))
+        distribuicao = distribuicao[distribuicao['Contagem'] > 0]  # Apenas bins com dados
+        bins = distribuicao['Faixa'].tolist()
+        counts = distribuicao['Contagem'].tolist()
+        bin_labels = [f"{count}" for count in counts]
         
-        # Criar bins e contar frequências
-        bins = []
-        counts = []
-        bin_labels = []
-        
-        for i in range(n_bins):
-            bin_start = min_val + (i * bin_width)
-            bin_end = min_val + ((i + 1) * bin_width)
-            
-            # Contar valores neste intervalo
-            count = len(df_presentes[(df_presentes['% Participação'] >= bin_start) & 
-                                    (df_presentes['% Participação'] < bin_end)])
+        def histograma():
+            # Criar gráfico de barras com barras separadas
+            fig = go.Figure()
             
-            if i == n_bins - 1:  # Último bin inclui o valor máximo
-                count = len(df_presentes[(df_presentes['% Participação'] >= bin_start) & 
-                                        (df_presentes['% Participação'] <= bin_end)])
+            fig.add_trace(go.Bar(
+                x=bins,
+                y=counts,
+                marker=dict(
+                    color=CORES['laranja'],
+                    line=dict(width=0),  # Sem borda para estilo shadcn/ui
+                    opacity=0.85
+                ),
+                text=bin_labels,  # Rótulos nas barras
+                textposition='outside',
+                textfont=dict(
+                    size=11,
+                    color=CORES['verde_escuro'],
+                    family='system-ui, -apple-system, sans-serif'
+                ),
+                hovertemplate='<b>%{x}</b><br>Frequência: %{y}<extra></extra>',
+                hoverlabel=dict(
+                    bgcolor='rgba(255, 255, 255, 0.95)',
+                    bordercolor='rgba(0, 0, 0, 0.1)',
+                    font=dict(size=12, color=CORES['verde_escuro'])
+                )
+            ))
             
-            if count > 0:  # Apenas adicionar bins com dados
-                bins.append(f"{bin_start:.0f}-{bin_end:.0f}%")
-                counts.append(count)
-                bin_labels.append(f"{count}")
-        
-        # Criar gráfico de barras com barras separadas
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=bins,
-            y=counts,
-            marker=dict(
-                color=CORES['laranja'],
-                line=dict(width=0),  # Sem borda para estilo shadcn/ui
-                opacity=0.85
-            ),
-            text=bin_labels,  # Rótulos nas barras
-            textposition='outside',
-            textfont=dict(
-                size=11,
-                color=CORES['verde_escuro'],
-                family='system-ui, -apple-system, sans-serif'
-            ),
-            hovertemplate='<b>%{x}</b><br>Frequência: %{y}<extra></extra>',
-            hoverlabel=dict(
-                bgcolor='rgba(255, 255, 255, 0.95)',
-                bordercolor='rgba(0, 0, 0, 0.1)',
-                font=dict(size=12, color=CORES['verde_escuro'])
+            # Aplicar estilo shadcn/ui
+            fig.update_layout(
+                title=dict(
+                    text='Distribuição de % de Participação',
+                    font=dict(size=16, color=CORES['verde_escuro'], family='system-ui, -apple-system, sans-serif'),
+                    x=0.02,
+                    xanchor='left',
+                    pad=dict(b=20, t=10)
+                ),
+                xaxis=dict(
+                    title='% de Participação',
+                    gridcolor='rgba(0, 0, 0, 0.06)',
+                    gridwidth=1,
+                    showgrid=True,
+                    zeroline=False,
+                    linecolor='rgba(0, 0, 0, 0.1)',
+                    linewidth=1,
+                    tickangle=-45
+                ),
+                yaxis=dict(
+                    title='Frequência',
+                    gridcolor='rgba(0, 0, 0, 0.06)',
+                    gridwidth=1,
+                    showgrid=True,
+                    zeroline=False,
+                    linecolor='rgba(0, 0, 0, 0.1)',
+                    linewidth=1
+                ),
+                plot_bgcolor='rgba(0, 0, 0, 0)',
+                paper_bgcolor='rgba(0, 0, 0, 0)',
+                font=dict(family='system-ui, -apple-system, sans-serif', size=12, color=CORES['verde_escuro']),
+                margin=dict(l=50, r=30, t=50, b=80),
+                showlegend=False,
+                bargap=0.3  # Espaçamento entre barras para estilo shadcn/ui
             )
-        ))
+            return fig
         
-        # Aplicar estilo shadcn/ui
-        fig.update_layout(
-            title=dict(
-                text='Distribuição de % de Participação',
-                font=dict(size=16, color=CORES['verde_escuro'], family='system-ui, -apple-system, sans-serif'),
-                x=0.02,
-                xanchor='left',
-                pad=dict(b=20, t=10)
-            ),
-            xaxis=dict(
-                title='% de Participação',
-                gridcolor='rgba(0, 0, 0, 0.06)',
-                gridwidth=1,
-                showgrid=True,
-                zeroline=False,
-                linecolor='rgba(0, 0, 0, 0.1)',
-                linewidth=1,
-                tickangle=-45
-            ),
-            yaxis=dict(
-                title='Frequência',
-                gridcolor='rgba(0, 0, 0, 0.06)',
-                gridwidth=1,
-                showgrid=True,
-                zeroline=False,
-                linecolor='rgba(0, 0, 0, 0.1)',
-                linewidth=1
-            ),
-            plot_bgcolor='rgba(0, 0, 0, 0)',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            font=dict(family='system-ui, -apple-system, sans-serif', size=12, color=CORES['verde_escuro']),
-            margin=dict(l=50, r=30, t=50, b=80),
-            showlegend=False,
-            bargap=0.3  # Espaçamento entre barras para estilo shadcn/ui
-        )
+        fig = cached_figure('distribuicao_participacao', distribuicao, histograma)
         
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Status de presença
         status_counts = df['Status'].value_counts()
+        status_counts = status_counts[status_counts > 0]
         # Obter cores da paleta expandida
         pizza_colors = get_pizza_colors(status_counts.index.tolist())
         
-        fig = px.pie(
-            values=status_counts.values,
-            names=status_counts.index,
-            color_discrete_sequence=pizza_colors
-        )
-        # Garantir que as cores sejam aplicadas corretamente usando a paleta
-        fig.update_traces(
-            marker=dict(
-                colors=pizza_colors,
-                line=dict(width=1, color='rgba(255, 255, 255, 0.8)')
+        def pizza_status():
+            fig = px.pie(
+                values=status_counts.values,
+                names=status_counts.index,
+                color_discrete_sequence=pizza_colors
             )
-        )
-        fig = apply_shadcn_style(fig, 'Distribuição de Presença/Ausência')
+            # Garantir que as cores sejam aplicadas corretamente usando a paleta
+            fig.update_traces(
+                marker=dict(
+                    colors=pizza_colors,
+                    line=dict(width=1, color='rgba(255, 255, 255, 0.8)')
+                )
+            )
+            fig = apply_shadcn_style(fig, 'Distribuição de Presença/Ausência')
+            return fig
+        
+        fig = cached_figure('status', status_counts, pizza_status)
         st.plotly_chart(fig, use_container_width=True)
     
     # Análise por curso
     st.markdown(f'<h2 class="section-title">Análise por Curso</h2>', unsafe_allow_html=True)
     
-    metrics_by_course = utils.get_metrics_by_course(df)
+    metrics_by_course = agregados['by_course']
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.bar(
-            metrics_by_course,
-            x='Curso',
-            y='Taxa_Presenca',
-            color='Taxa_Presenca',
-            color_continuous_scale=ESCALA_CONTINUA,
-            labels={'Taxa_Presenca': 'Taxa de Presença (%)', 'Curso': 'Curso'}
-        )
-        fig = apply_shadcn_style(fig, 'Taxa de Presença por Curso')
-        fig.update_layout(showlegend=False)
+        def barras_presenca():
+            fig = px.bar(
+                metrics_by_course,
+                x='Curso',
+                y='Taxa_Presenca',
+                color='Taxa_Presenca',
+                color_continuous_scale=ESCALA_CONTINUA,
+                labels={'Taxa_Presenca': 'Taxa de Presença (%)', 'Curso': 'Curso'}
+            )
+            fig = apply_shadcn_style(fig, 'Taxa de Presença por Curso')
+            fig.update_layout(showlegend=False)
+            return fig
+        
+        fig = cached_figure('curso_presenca', metrics_by_course[['Curso', 'Taxa_Presenca']], barras_presenca)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        fig = px.bar(
-            metrics_by_course,
-            x='Curso',
-            y='Media_Participacao',
-            color='Media_Participacao',
-            color_continuous_scale=ESCALA_CONTINUA,
-            labels={'Media_Participacao': 'Média de Participação (%)', 'Curso': 'Curso'}
-        )
-        fig = apply_shadcn_style(fig, 'Média de Participação por Curso')
-        fig.update_layout(showlegend=False)
+        def barras_participacao():
+            fig = px.bar(
+                metrics_by_course,
+                x='Curso',
+                y='Media_Participacao',
+                color='Media_Participacao',
+                color_continuous_scale=ESCALA_CONTINUA,
+                labels={'Media_Participacao': 'Média de Participação (%)', 'Curso': 'Curso'}
+            )
+            fig = apply_shadcn_style(fig, 'Média de Participação por Curso')
+            fig.update_layout(showlegend=False)
+            return fig
+        
+        fig = cached_figure('curso_participacao', metrics_by_course[['Curso', 'Media_Participacao']], barras_participacao)
         st.plotly_chart(fig, use_container_width=True)
     
     # Tabela detalhada
@@ -1104,7 +1331,7 @@ def show_panorama_geral(df):
     # Insights Estratégicos e Sugestões de Ações
     st.markdown(f'<h2 class="section-title">Insights Estratégicos e Recomendações</h2>', unsafe_allow_html=True)
     
-    insights, acoes = generate_strategic_insights(df)
+    insights, acoes = memoized('insights', filtros, lambda: generate_strategic_insights(df, agregados))
     
     # Seção de Insights
     st.markdown(f'<h3 style="color: {CORES["verde_escuro"]};">Insights Estratégicos</h3>', unsafe_allow_html=True)
@@ -1170,50 +1397,77 @@ def show_panorama_geral(df):
     **Responsabilidade**: A área de T&D é responsável pela gestão, atualização e governança adequada destes dados.
     """)
 
-def show_por_area(df):
-    """Exibe análise por área/diretor"""
-    st.markdown(f'<h2 class="section-title">Análise por Área/Diretor</h2>', unsafe_allow_html=True)
+def show_por_area(df, metrics_by_director=None, filtros=None, historico=None):
+    """Exibe análise por área/diretor
     
-    metrics_by_director = utils.get_metrics_by_director(df)
+    historico(diretor) retorna as linhas do diretor (por padrão, filtrando df).
+    """
+    if historico is None:
+        historico = lambda diretor: df[df['Diretor'] == diretor]
+    st.markdown(f'<h2 class="section-title">Análise por Área/Diretor</h2>', unsafe_allow_html=True)
     
-    # Seleção de diretor para análise detalhada
-    diretor_detalhe = st.selectbox(
-        "Selecione um diretor para análise detalhada:",
-        ['Todos'] + sorted(metrics_by_director['Diretor'].tolist())
-    )
+    if metrics_by_director is None:
+        metrics_by_director = utils.get_metrics_by_director(df)
     
     # Gráficos comparativos
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.bar(
-            metrics_by_director.sort_values('Taxa_Presenca', ascending=True),
-            x='Taxa_Presenca',
-            y='Diretor',
-            orientation='h',
-            color='Taxa_Presenca',
-            color_continuous_scale=ESCALA_CONTINUA,
-            labels={'Taxa_Presenca': 'Taxa de Presença (%)', 'Diretor': 'Diretor'}
-        )
-        fig = apply_shadcn_style(fig, 'Taxa de Presença por Diretor')
-        fig.update_layout(height=400, showlegend=False)
+        def barras_presenca():
+            fig = px.bar(
+                metrics_by_director.sort_values('Taxa_Presenca', ascending=True),
+                x='Taxa_Presenca',
+                y='Diretor',
+                orientation='h',
+                color='Taxa_Presenca',
+                color_continuous_scale=ESCALA_CONTINUA,
+                labels={'Taxa_Presenca': 'Taxa de Presença (%)', 'Diretor': 'Diretor'}
+            )
+            fig = apply_shadcn_style(fig, 'Taxa de Presença por Diretor')
+            fig.update_layout(height=400, showlegend=False)
+            return fig
+        
+        fig = cached_figure('diretor_presenca', metrics_by_director[['Diretor', 'Taxa_Presenca']], barras_presenca)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        fig = px.bar(
-            metrics_by_director.sort_values('Media_Participacao', ascending=True),
-            x='Media_Participacao',
-            y='Diretor',
-            orientation='h',
-            color='Media_Participacao',
-            color_continuous_scale=ESCALA_CONTINUA,
-            labels={'Media_Participacao': 'Média de Participação (%)', 'Diretor': 'Diretor'}
-        )
-        fig = apply_shadcn_style(fig, 'Média de Participação por Diretor')
-        fig.update_layout(height=400, showlegend=False)
+        def barras_participacao():
+            fig = px.bar(
+                metrics_by_director.sort_values('Media_Participacao', ascending=True),
+                x='Media_Participacao',
+                y='Diretor',
+                orientation='h',
+                color='Media_Participacao',
+                color_continuous_scale=ESCALA_CONTINUA,
+                labels={'Media_Participacao': 'Média de Participação (%)', 'Diretor': 'Diretor'}
+            )
+            fig = apply_shadcn_style(fig, 'Média de Participação por Diretor')
+            fig.update_layout(height=400, showlegend=False)
+            return fig
+        
+        fig = cached_figure('diretor_participacao', metrics_by_director[['Diretor', 'Media_Participacao']], barras_participacao)
         st.plotly_chart(fig, use_container_width=True)
     
-    # Gráfico de radar para comparação
+    # Seleção e análise detalhada de um diretor (fragmento)
+    show_detalhe_diretor(metrics_by_director, filtros, historico)
+    
+    # Tabela completa
+    st.markdown(f'<h2 class="section-title">Métricas Completas por Diretor</h2>', unsafe_allow_html=True)
+    paged_table(metrics_by_director, "tabela_diretores", sort_by='Taxa_Presenca')
+
+@drill_down_fragment
+def show_detalhe_diretor(metrics_by_director, filtros=None, historico=None):
+    """Seleção e análise detalhada de um diretor
+    
+    Roda como fragmento: trocar o diretor refaz só esta seção, reaproveitando
+    as métricas e o histórico já filtrados na execução completa.
+    """
+    diretor_detalhe = st.selectbox(
+        "Selecione um diretor para análise detalhada:",
+        ['Todos'] + sorted(metrics_by_director['Diretor'].tolist()),
+        key="diretor_detalhe"
+    )
+    
     if diretor_detalhe != 'Todos':
         st.markdown(f'<h3 style="color: {CORES["verde_escuro"]};">Análise Detalhada: {diretor_detalhe}</h3>', unsafe_allow_html=True)
         
@@ -1231,8 +1485,9 @@ def show_por_area(df):
             st.metric("Média Câmera", f"{camera_val:.1f}%")
         
         # Participantes desta área
-        df_dir = df[df['Diretor'] == diretor_detalhe]
-        participantes_dir = utils.get_individual_metrics(df_dir)
+        participantes_dir = memoized(('individual', diretor_detalhe), filtros,
+                                     lambda: utils.get_individual_metrics(historico(diretor_detalhe)),
+                                     memo=selection_memo())
         
         st.markdown(f'<h4 style="color: {CORES["verde_escuro"]};">Participantes desta Área</h4>', unsafe_allow_html=True)
         st.dataframe(
@@ -1241,63 +1496,87 @@ def show_por_area(df):
             use_container_width=True,
             hide_index=True
         )
-    
-    # Tabela completa
-    st.markdown(f'<h2 class="section-title">Métricas Completas por Diretor</h2>', unsafe_allow_html=True)
-    st.dataframe(
-        metrics_by_director.sort_values('Taxa_Presenca', ascending=False).style.background_gradient(
-            subset=['Taxa_Presenca', 'Media_Participacao', 'Taxa_Pesquisa'], 
-            cmap='RdYlGn'
-        ),
-        use_container_width=True,
-        hide_index=True
-    )
 
-def show_por_participante(df):
-    """Exibe análise por participante individual"""
+def show_por_participante(df, filtros=None, historico=None, indice_nomes=None):
+    """Exibe análise por participante individual
+    
+    historico(participante) retorna as linhas do participante (por padrão, filtrando df);
+    indice_nomes é o utils.NameSearchIndex usado na busca por nome.
+    """
+    if historico is None:
+        historico = lambda participante: df[df['Participante'] == participante]
     st.markdown(f'<h2 class="section-title">Análise Individual</h2>', unsafe_allow_html=True)
     
-    individual_metrics = utils.get_individual_metrics(df)
+    individual_metrics = memoized('individual', filtros, lambda: utils.get_individual_metrics(df))
     
     # Busca de participante
     st.markdown(f'<div style="margin-bottom: 0.5rem;">{icon_html("search", 18, CORES["verde_escuro"])} <strong>Buscar participante:</strong></div>', unsafe_allow_html=True)
-    participante_search = st.text_input("", "", label_visibility="collapsed", placeholder="Digite o nome do participante...")
+    participante_search = st.text_input("", "", label_visibility="collapsed", placeholder="Digite o nome do participante...",
+                                        key="busca_participante")
+    # Busca no servidor (sem acentos) em vez de filtrar a lista no navegador:
+    # as tabelas mostram os nomes que contêm o texto digitado
+    if indice_nomes is None:
+        indice_nomes = utils.NameSearchIndex(individual_metrics['Participante'])
+    candidatos = individual_metrics
     if participante_search:
-        individual_metrics = individual_metrics[
-            individual_metrics['Participante'].str.contains(participante_search, case=False, na=False)
-        ]
+        individual_metrics = individual_metrics[individual_metrics['Participante'].isin(indice_nomes.matches(participante_search))]
     
     # Filtro por diretor
     diretores_ind = ['Todos'] + sorted(individual_metrics['Diretor'].unique().tolist())
-    diretor_ind = st.selectbox("Filtrar por Diretor:", diretores_ind)
+    diretor_ind = st.selectbox("Filtrar por Diretor:", diretores_ind, key="diretor_participante")
     if diretor_ind != 'Todos':
         individual_metrics = individual_metrics[individual_metrics['Diretor'] == diretor_ind]
+        candidatos = candidatos[candidatos['Diretor'] == diretor_ind]
     
-    # Top performers
+    # Top performers (seleção parcial, guardada por filtro, busca e diretor)
+    rankings = memoized(('ranking', participante_search, diretor_ind), filtros,
+                        lambda: utils.top_n(individual_metrics, ['Media_Participacao', 'Taxa_Presenca'], n=10),
+                        memo=selection_memo())
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown(f'<h3 style="color: {CORES["verde_escuro"]};">{icon_html("trophy", 24, CORES["laranja"])} Top 10 - Maior Participação Média</h3>', unsafe_allow_html=True)
-        top_participacao = individual_metrics.nlargest(10, 'Media_Participacao')[
+        top_participacao = rankings['Media_Participacao'][
             ['Participante', 'Diretor', 'Media_Participacao', 'Cursos_Diferentes', 'Taxa_Pesquisa']
         ]
         st.dataframe(top_participacao, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown(f'<h3 style="color: {CORES["verde_escuro"]};">{icon_html("chart", 24, CORES["laranja"])} Top 10 - Maior Taxa de Presença</h3>', unsafe_allow_html=True)
-        top_presenca = individual_metrics.nlargest(10, 'Taxa_Presenca')[
+        top_presenca = rankings['Taxa_Presenca'][
             ['Participante', 'Diretor', 'Taxa_Presenca', 'Presentes', 'Total_Convites', 'Taxa_Pesquisa']
         ]
         st.dataframe(top_presenca, use_container_width=True, hide_index=True)
     
-    # Análise detalhada de um participante
+    # Só os melhores resultados da busca vão para o navegador; as semelhanças por
+    # trigramas (erros de digitação) entram no seletor depois dos nomes que contêm a busca
+    participantes_list = ['Selecione...'] + indice_nomes.search(
+        participante_search, limit=PARTICIPANT_OPTIONS, among=candidatos['Participante'])
+    
+    # Análise detalhada de um participante (fragmento)
+    show_detalhe_participante(candidatos, participantes_list, historico)
+    
+    # Tabela completa
+    st.markdown(f'<h2 class="section-title">Todos os Participantes</h2>', unsafe_allow_html=True)
+    paged_table(individual_metrics, "tabela_participantes", sort_by='Media_Participacao')
+
+@drill_down_fragment
+def show_detalhe_participante(individual_metrics, participantes_list, historico):
+    """Seleção e análise detalhada de um participante
+    
+    Roda como fragmento: trocar o participante refaz só esta seção;
+    participantes_list são as opções já ordenadas pela busca, entre os
+    participantes de individual_metrics.
+    """
     st.markdown(f'<h2 class="section-title">Análise Detalhada por Participante</h2>', unsafe_allow_html=True)
     
-    participantes_list = ['Selecione...'] + sorted(individual_metrics['Participante'].tolist())
-    participante_selecionado = st.selectbox("Selecione um participante:", participantes_list)
+    participante_selecionado = st.selectbox("Selecione um participante:", participantes_list, key="participante_selecionado")
+    if len(participantes_list) > PARTICIPANT_OPTIONS and len(individual_metrics) > PARTICIPANT_OPTIONS:
+        st.caption(f"Mostrando os {PARTICIPANT_OPTIONS} melhores resultados de {len(individual_metrics)} participantes. "
+                   "Digite parte do nome na busca acima para refinar.")
     
     if participante_selecionado != 'Selecione...':
-        participante_data = df[df['Participante'] == participante_selecionado]
+        participante_data = historico(participante_selecionado)
         participante_metrics = individual_metrics[individual_metrics['Participante'] == participante_selecionado].iloc[0]
         
         col1, col2, col3, col4, col5 = st.columns(5)
@@ -1320,124 +1599,166 @@ def show_por_participante(df):
             use_container_width=True,
             hide_index=True
         )
-    
-    # Tabela completa
-    st.markdown(f'<h2 class="section-title">Todos os Participantes</h2>', unsafe_allow_html=True)
-    st.dataframe(
-        individual_metrics.sort_values('Media_Participacao', ascending=False).style.background_gradient(
-            subset=['Taxa_Presenca', 'Media_Participacao', 'Taxa_Pesquisa'], 
-            cmap='RdYlGn'
-        ),
-        use_container_width=True,
-        hide_index=True
-    )
 
-def show_evolucao_temporal(df):
-    """Exibe evolução temporal dos indicadores"""
+def show_evolucao_temporal(time_series, sessions=None):
+    """Exibe evolução temporal dos indicadores a partir da série temporal já agregada
+    
+    sessions é a tabela de sessões (uma linha por data e curso) usada na
+    comparação entre cursos; sem ela, essa seção não é exibida.
+    """
     st.markdown(f'<h2 class="section-title">Evolução Temporal dos Indicadores</h2>', unsafe_allow_html=True)
     
-    time_series = utils.get_time_series_metrics(df)
+    # Séries longas: o gráfico mostra um período escolhido, reduzido a POINT_BUDGET pontos por curva
+    serie = time_series[['Data', 'Taxa_Presenca', 'Media_Participacao', 'Taxa_Pesquisa', 'Media_Camera']]
+    serie = serie.assign(Media_Camera=serie['Media_Camera'].fillna(0))
+    if len(serie) > POINT_BUDGET:
+        inicio, fim = st.slider(
+            "Período do gráfico:",
+            min_value=serie['Data'].min().to_pydatetime(),
+            max_value=serie['Data'].max().to_pydatetime(),
+            value=(serie['Data'].min().to_pydatetime(), serie['Data'].max().to_pydatetime()),
+            format="DD/MM/YYYY"
+        )
+        serie = serie[(serie['Data'] >= inicio) & (serie['Data'] <= fim)]
+        if len(serie) > POINT_BUDGET:
+            st.caption(f"Cada curva mostra {POINT_BUDGET} de {len(serie)} datas, escolhidas para preservar "
+                       "picos e vales. Reduza o período para ver todos os pontos.")
     
     # Gráfico de evolução
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Taxa de Presença ao Longo do Tempo', 
-                       'Média de Participação ao Longo do Tempo',
-                       'Taxa de Resposta em Pesquisas', 
-                       'Média de Câmera Aberta'),
-        vertical_spacing=0.12
-    )
-    
-    # Taxa de presença
-    fig.add_trace(
-        go.Scatter(x=time_series['Data'], y=time_series['Taxa_Presenca'],
-                  mode='lines+markers', name='Taxa Presença',
-                  line=dict(color=CORES['verde'], width=3)),
-        row=1, col=1
-    )
-    
-    # Média participação
-    fig.add_trace(
-        go.Scatter(x=time_series['Data'], y=time_series['Media_Participacao'],
-                  mode='lines+markers', name='Média Participação',
-                  line=dict(color=CORES['laranja'], width=3)),
-        row=1, col=2
-    )
-    
-    # Taxa pesquisa
-    fig.add_trace(
-        go.Scatter(x=time_series['Data'], y=time_series['Taxa_Pesquisa'],
-                  mode='lines+markers', name='Taxa Pesquisa',
-                  line=dict(color=CORES['verde_escuro'], width=3)),
-        row=2, col=1
-    )
-    
-    # Média câmera
-    camera_data = time_series['Media_Camera'].fillna(0)
-    fig.add_trace(
-        go.Scatter(x=time_series['Data'], y=camera_data,
-                  mode='lines+markers', name='Média Câmera',
-                  line=dict(color=CORES['verde'], width=3)),
-        row=2, col=2
-    )
-    
-    # Aplicar estilo shadcn/ui para subplots
-    fig.update_layout(
-        height=700,
-        plot_bgcolor='rgba(0, 0, 0, 0)',
-        paper_bgcolor='rgba(0, 0, 0, 0)',
-        font=dict(
-            family='system-ui, -apple-system, sans-serif',
-            size=12,
-            color=CORES['verde_escuro']
-        ),
-        hovermode='x unified',
-        hoverlabel=dict(
-            bgcolor='rgba(255, 255, 255, 0.95)',
-            bordercolor='rgba(0, 0, 0, 0.1)',
+    def evolucao():
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('Taxa de Presença ao Longo do Tempo', 
+                           'Média de Participação ao Longo do Tempo',
+                           'Taxa de Resposta em Pesquisas', 
+                           'Média de Câmera Aberta'),
+            vertical_spacing=0.12
+        )
+        
+        # Taxa de presença
+        fig.add_trace(
+            series_trace(serie, 'Taxa_Presenca',
+                         mode='lines+markers', name='Taxa Presença',
+                         line=dict(color=CORES['verde'], width=3)),
+            row=1, col=1
+        )
+        
+        # Média participação
+        fig.add_trace(
+            series_trace(serie, 'Media_Participacao',
+                         mode='lines+markers', name='Média Participação',
+                         line=dict(color=CORES['laranja'], width=3)),
+            row=1, col=2
+        )
+        
+        # Taxa pesquisa
+        fig.add_trace(
+            series_trace(serie, 'Taxa_Pesquisa',
+                         mode='lines+markers', name='Taxa Pesquisa',
+                         line=dict(color=CORES['verde_escuro'], width=3)),
+            row=2, col=1
+        )
+        
+        # Média câmera
+        fig.add_trace(
+            series_trace(serie, 'Media_Camera',
+                         mode='lines+markers', name='Média Câmera',
+                         line=dict(color=CORES['verde'], width=3)),
+            row=2, col=2
+        )
+        
+        # Aplicar estilo shadcn/ui para subplots
+        fig.update_layout(
+            height=700,
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            paper_bgcolor='rgba(0, 0, 0, 0)',
             font=dict(
-                size=12,
                 family='system-ui, -apple-system, sans-serif',
+                size=12,
                 color=CORES['verde_escuro']
-            )
-        ),
-        showlegend=False
-    )
-    
-    # Atualizar eixos para estilo shadcn/ui
-    for i in range(1, 3):
-        for j in range(1, 3):
-            fig.update_xaxes(
-                gridcolor='rgba(0, 0, 0, 0.06)',
-                gridwidth=1,
-                showgrid=True,
-                zeroline=False,
-                linecolor='rgba(0, 0, 0, 0.1)',
-                linewidth=1,
-                row=i, col=j
-            )
-            fig.update_yaxes(
-                gridcolor='rgba(0, 0, 0, 0.06)',
-                gridwidth=1,
-                showgrid=True,
-                zeroline=False,
-                linecolor='rgba(0, 0, 0, 0.1)',
-                linewidth=1,
-                row=i, col=j
-            )
+            ),
+            hovermode='x unified',
+            hoverlabel=dict(
+                bgcolor='rgba(255, 255, 255, 0.95)',
+                bordercolor='rgba(0, 0, 0, 0.1)',
+                font=dict(
+                    size=12,
+                    family='system-ui, -apple-system, sans-serif',
+                    color=CORES['verde_escuro']
+                )
+            ),
+            showlegend=False
+        )
+        
+        # Atualizar eixos para estilo shadcn/ui
+        for i in range(1, 3):
+            for j in range(1, 3):
+                fig.update_xaxes(
+                    gridcolor='rgba(0, 0, 0, 0.06)',
+                    gridwidth=1,
+                    showgrid=True,
+                    zeroline=False,
+                    linecolor='rgba(0, 0, 0, 0.1)',
+                    linewidth=1,
+                    row=i, col=j
+                )
+                fig.update_yaxes(
+                    gridcolor='rgba(0, 0, 0, 0.06)',
+                    gridwidth=1,
+                    showgrid=True,
+                    zeroline=False,
+                    linecolor='rgba(0, 0, 0, 0.1)',
+                    linewidth=1,
+                    row=i, col=j
+                )
+        
+        return fig
     
+    fig = cached_figure('evolucao', serie, evolucao, params=(POINT_BUDGET, WEBGL_THRESHOLD))
     st.plotly_chart(fig, use_container_width=True)
     
     # Tabela temporal
     st.markdown(f'<h2 class="section-title">Dados Temporais Detalhados</h2>', unsafe_allow_html=True)
-    st.dataframe(
-        time_series.sort_values('Data', ascending=False).style.background_gradient(
-            subset=['Taxa_Presenca', 'Media_Participacao', 'Taxa_Pesquisa'], 
-            cmap='RdYlGn'
-        ),
-        use_container_width=True,
-        hide_index=True
+    paged_table(time_series, "tabela_temporal", sort_by='Data')
+    
+    if sessions is None or sessions.empty:
+        return
+    
+    # Sessões por curso: cada data de cada curso é um ponto, sem misturar cursos do mesmo dia
+    st.markdown(f'<h2 class="section-title">Sessões por Curso</h2>', unsafe_allow_html=True)
+    cursos = sorted(sessions['Curso'].unique().tolist())
+    # Seleção inicial pelo session_state: a chave também guarda a escolha entre abas
+    st.session_state.setdefault("cursos_sessao", cursos[:3])
+    cursos_sessao = st.multiselect(
+        "Cursos para comparar:",
+        cursos,
+        placeholder="Selecione os cursos",
+        key="cursos_sessao"
     )
+    if not cursos_sessao:
+        st.info("Selecione ao menos um curso para comparar as sessões.")
+        return
+    
+    sessoes_cursos = sessions[sessions['Curso'].isin(cursos_sessao)]
+    
+    def linhas_sessoes():
+        fig = px.line(
+            sessoes_cursos,
+            x='Data',
+            y='Taxa_Presenca',
+            color='Curso',
+            markers=True,
+            color_discrete_sequence=PALETA_CORES,
+            labels={'Taxa_Presenca': 'Taxa de Presença (%)', 'Data': 'Data'}
+        )
+        fig = apply_shadcn_style(fig, 'Taxa de Presença por Sessão')
+        fig.update_layout(height=400)
+        return fig
+    
+    fig = cached_figure('sessoes', sessoes_cursos[['Data', 'Curso', 'Taxa_Presenca']], linhas_sessoes)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    paged_table(sessoes_cursos, "tabela_sessoes", sort_by='Data')
 
 if __name__ == "__main__":
     main()
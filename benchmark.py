@@ -0,0 +1,608 @@
+"""
+Micro-benchmarks das rotinas de carga e processamento de dados.
+
+Uso:
+    python benchmark.py            # verificações e medições
+    python benchmark.py --check    # só as verificações (check_*)
+
+Os dados sintéticos são gerados a partir do formato do Base_Dados_Cursos.csv,
+então os números são comparáveis entre máquinas apenas de forma relativa.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import utils
+
+
+def generate_sample(n_rows, seed=42):
+    """Gera um DataFrame sintético com o mesmo formato do CSV de origem"""
+    rng = np.random.default_rng(seed)
+    horas = rng.integers(0, 3, n_rows)
+    minutos = rng.integers(0, 60, n_rows)
+    segundos = rng.integers(0, 60, n_rows)
+    participacao = pd.Series([f"{h}:{m:02d}:{s:02d}" for h, m, s in zip(horas, minutos, segundos)])
+    # Alguns valores vazios e malformados, como na base real
+    participacao[rng.random(n_rows) < 0.05] = ''
+    participacao[rng.random(n_rows) < 0.01] = 'n/d'
+    duracao = pd.Series(rng.choice(['1:00:00', '1:30:00', '2:00:00', '2:00'], n_rows))
+    datas = pd.date_range('2023-01-01', periods=700, freq='D').strftime('%d/%m/%Y')
+    status = rng.choice(['Presente', 'Ausente'], n_rows)
+
+    return pd.DataFrame({
+        'Data': rng.choice(datas, n_rows),
+        'Participante': [f"PARTICIPANTE {i}" for i in rng.integers(0, max(n_rows // 20, 1), n_rows)],
+        'Diretor': [f"DIRETOR {i}" for i in rng.integers(0, 40, n_rows)],
+        'Curso': [f"Curso {i}" for i in rng.integers(0, 30, n_rows)],
+        'Duração': duracao,
+        'Participação': participacao,
+        '% Participação': [f"{v}%" for v in rng.integers(0, 110, n_rows)],
+        '% Câmera aberta': np.where(rng.random(n_rows) < 0.5, '', [f"{v}%" for v in rng.integers(0, 100, n_rows)]),
+        'Respondeu a Pesquisa de Satisfação?': rng.choice(['Sim', 'Não'], n_rows),
+        'Status': status,
+        'Motivo Ausência': np.where(status == 'Ausente', rng.choice(['Férias', 'Agenda', ''], n_rows), ''),
+    })
+
+
+def _timeit(func, repeat=3):
+    melhor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def bench_parsing(n_rows):
+    """Compara a conversão linha a linha com a conversão vetorizada"""
+    df = generate_sample(n_rows)
+
+    def por_linha():
+        df['Participação'].apply(utils.convert_time_to_minutes)
+        df['Duração'].apply(utils.convert_time_to_minutes)
+        df['Respondeu a Pesquisa de Satisfação?'].apply(lambda x: 1 if x == 'Sim' else 0)
+        df['Status'].apply(lambda x: 1 if x == 'Presente' else 0)
+
+    def vetorizado():
+        utils.convert_time_series_to_minutes(df['Participação'])
+        utils.convert_time_series_to_minutes(df['Duração'])
+        (df['Respondeu a Pesquisa de Satisfação?'] == 'Sim').astype(int)
+        (df['Status'] == 'Presente').astype(int)
+
+    # Os dois caminhos devem produzir exatamente os mesmos minutos
+    esperado = df['Participação'].apply(utils.convert_time_to_minutes).astype(float)
+    obtido = utils.convert_time_series_to_minutes(df['Participação'])
+    assert np.array_equal(esperado.to_numpy(), obtido.to_numpy())
+
+    t_linha = _timeit(por_linha, repeat=1)
+    t_vetor = _timeit(vetorizado)
+    print(f"{n_rows:>10,} linhas | por linha: {t_linha:8.3f}s | vetorizado: {t_vetor:8.3f}s | "
+          f"ganho: {t_linha / t_vetor:6.1f}x")
+
+
+def bench_schema(n_rows):
+    """Compara memória e latência dos agrupamentos com e sem DTYPE_SCHEMA"""
+    bruto = utils.process_raw_data(generate_sample(n_rows), compact=False)
+    compacto = utils.apply_schema(bruto)
+
+    mem_bruto = utils.memory_footprint(bruto) / 1024 ** 2
+    mem_compacto = utils.memory_footprint(compacto) / 1024 ** 2
+    print(f"{n_rows:>10,} linhas | memória: {mem_bruto:8.1f} MB -> {mem_compacto:8.1f} MB")
+
+    for func in (utils.get_metrics_by_director, utils.get_metrics_by_course,
+                 utils.get_individual_metrics, utils.get_time_series_metrics):
+        t_bruto = _timeit(lambda: func(bruto))
+        t_compacto = _timeit(lambda: func(compacto))
+        print(f"{'':>10}        | {func.__name__:<28} {t_bruto:8.3f}s -> {t_compacto:8.3f}s")
+
+
+def _peak_rss_mb(code):
+    """Executa o código em um processo novo e retorna o pico de memória (MB)
+
+    Usa VmHWM do Linux, que ao contrário de ru_maxrss não herda o pico do
+    processo pai.
+    """
+    script = (f"import utils\n{code}\n"
+              "print([l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM')][0])")
+    saida = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+    return int(saida.stdout.split()[-1]) / 1024
+
+
+def bench_streaming(n_rows, chunksize=100_000):
+    """Compara o pico de memória da carga completa com a leitura em blocos"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'base.csv')
+        generate_sample(n_rows).to_csv(csv_path, sep=';', index=False)
+
+        completo = _peak_rss_mb(
+            f"df = utils.load_data({csv_path!r}, use_cache=False)\n"
+            "utils.get_summary_metrics(df); utils.get_metrics_by_director(df)\n"
+            "utils.get_metrics_by_course(df); utils.get_time_series_metrics(df)"
+        )
+        streaming = _peak_rss_mb(f"utils.load_aggregates_streaming({csv_path!r}, chunksize={chunksize})")
+    print(f"{n_rows:>10,} linhas | pico em memória: {completo:8.1f} MB | pico em blocos: {streaming:8.1f} MB")
+
+
+def bench_dataset(n_files, rows_per_file):
+    """Compara a carga sequencial e paralela de vários snapshots mensais"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(n_files):
+            generate_sample(rows_per_file, seed=i).to_csv(
+                os.path.join(tmp, f'Base_Dados_Cursos_{i:02d}.csv'), sep=';', index=False)
+
+        t_seq = _timeit(lambda: utils.load_dataset(tmp, max_workers=1, use_cache=False), repeat=1)
+        t_par = _timeit(lambda: utils.load_dataset(tmp, use_cache=False), repeat=1)
+    print(f"{n_files:>3} arquivos x {rows_per_file:,} linhas | sequencial: {t_seq:8.3f}s | "
+          f"paralelo ({os.cpu_count()} núcleos): {t_par:8.3f}s")
+
+
+
+def bench_append(n_rows, n_new=100):
+    """Compara regravar o cache inteiro com anexar uma parte (utils.append_records)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'Base_Dados_Cursos.csv')
+        generate_sample(n_rows).to_csv(csv_path, sep=';', index=False)
+        utils.load_data(csv_path)
+        novos = generate_sample(n_new, seed=1)
+
+        def regravar():
+            df = utils.combine_frames([utils.load_data(csv_path), utils.process_raw_data(novos.copy())])
+            utils.write_parsed_cache(csv_path, df)
+
+        t_full = _timeit(regravar, repeat=1)
+        t_part = _timeit(lambda: utils.append_records(csv_path, novos), repeat=3)
+    print(f"{n_rows:>10,} linhas + {n_new} novas | regravar o cache: {t_full * 1000:8.1f}ms | "
+          f"parte anexada: {t_part * 1000:8.1f}ms")
+
+def bench_sqlite(n_rows):
+    """Compara carga completa + filtro em memória com o filtro no SQLite"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'base.csv')
+        db_path = os.path.join(tmp, 'base.sqlite')
+        generate_sample(n_rows).to_csv(csv_path, sep=';', index=False)
+        utils.import_csv_to_sqlite(csv_path, db_path)
+
+        def em_memoria():
+            df = utils.load_data(csv_path)
+            df = df[df['Curso'] == 'Curso 3']
+            utils.get_metrics_by_director(df)
+
+        def sqlite():
+            utils.get_aggregates_sqlite(db_path, cursos='Curso 3')
+
+        t_mem = _timeit(em_memoria)
+        t_sql = _timeit(sqlite)
+    print(f"{n_rows:>10,} linhas | CSV/Parquet + filtro: {t_mem:8.3f}s | SQLite com índice: {t_sql:8.3f}s")
+
+
+def bench_lazy(n_rows):
+    """Compara a carga completa com a projeção das colunas da série temporal"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'base.csv')
+        generate_sample(n_rows).to_csv(csv_path, sep=';', index=False)
+        utils.load_data(csv_path)  # gera o cache Parquet
+        colunas = utils.columns_for('get_time_series_metrics')
+
+        t_completo = _timeit(lambda: utils.get_time_series_metrics(utils.load_data(csv_path)))
+        t_lazy = _timeit(lambda: utils.get_time_series_metrics(utils.LazyDataset(csv_path).get(colunas)))
+        mem_completo = utils.memory_footprint(utils.load_data(csv_path)) / 1024 ** 2
+        mem_lazy = utils.memory_footprint(utils.LazyDataset(csv_path).get(colunas)) / 1024 ** 2
+    print(f"{n_rows:>10,} linhas | completo: {t_completo:8.3f}s {mem_completo:8.1f} MB | "
+          f"colunas sob demanda: {t_lazy:8.3f}s {mem_lazy:8.1f} MB")
+
+
+def _groupby_views(df):
+    """Implementação anterior das visões: um groupby independente por função"""
+    agg = {
+        'Presente': ['sum', 'count'],
+        'Participação_minutos': 'sum',
+        'Duração_minutos': 'sum',
+        'Respondeu_Pesquisa': 'sum',
+        '% Câmera aberta': 'mean'
+    }
+    df.groupby('Diretor', observed=True).agg(agg)
+    df.groupby('Curso', observed=True).agg(agg)
+    df.sort_values('Data').groupby('Data').agg({**agg, 'Curso': 'first'})
+    df.groupby('Participante', observed=True).agg({
+        'Presente': ['sum', 'count'], '% Participação': 'mean', 'Respondeu_Pesquisa': 'sum',
+        '% Câmera aberta': 'mean', 'Curso': 'nunique', 'Diretor': 'first'
+    })
+
+
+def bench_fused(n_rows):
+    """Compara os groupbys independentes com a agregação única de aggregate_metrics"""
+    df = utils.process_raw_data(generate_sample(n_rows))
+    t_groupby = _timeit(lambda: _groupby_views(df))
+    t_fused = _timeit(lambda: utils.aggregate_metrics(df))
+    print(f"{n_rows:>10,} linhas | groupby por visão: {t_groupby:8.3f}s | agregação única: {t_fused:8.3f}s")
+
+
+def bench_cube(n_rows):
+    """Compara o filtro sobre as linhas com o filtro sobre o cubo Data x Curso x Diretor"""
+    bruto = generate_sample(n_rows)
+    # Como na base real: um curso por data e cada participante ligado a um diretor
+    bruto['Curso'] = 'Curso ' + (pd.factorize(bruto['Data'])[0] % 30).astype(str)
+    bruto['Diretor'] = 'DIRETOR ' + (pd.factorize(bruto['Participante'])[0] % 40).astype(str)
+    df = utils.process_raw_data(bruto)[utils.CUBE_COLUMNS]
+    t_build = _timeit(lambda: utils.MetricsCube.from_frame(df), repeat=1)
+    cubo = utils.MetricsCube.from_frame(df)
+    filtros = {'date_range': (df['Data'].min(), df['Data'].median()), 'cursos': 'Curso 3'}
+    views = ['summary', 'by_director', 'by_course', 'time_series']
+
+    t_linhas = _timeit(lambda: utils.aggregate_metrics(df[utils.filter_mask(df, **filtros)], views))
+    t_cubo = _timeit(lambda: cubo.aggregate(views, **filtros))
+    print(f"{n_rows:>10,} linhas ({len(cubo):,} células, construção {t_build:.3f}s) | "
+          f"filtro nas linhas: {t_linhas:8.3f}s | filtro no cubo: {t_cubo:8.3f}s")
+
+
+def bench_memo(n_rows, n_requests=200):
+    """Simula reruns com combinações de filtros repetidas, com e sem MetricsMemo"""
+    df = utils.process_raw_data(generate_sample(n_rows))
+    rng = np.random.default_rng(0)
+    # Poucos cursos populares: a maioria dos pedidos repete uma combinação já vista
+    pedidos = [f"Curso {i}" for i in rng.zipf(1.5, n_requests) % 30]
+    memo = utils.MetricsMemo(maxsize=16, ttl=600)
+
+    def calcular(curso):
+        return utils.get_individual_metrics(df[utils.filter_mask(df, cursos=curso)])
+
+    t_sem = _timeit(lambda: [calcular(c) for c in pedidos], repeat=1)
+    t_com = _timeit(lambda: [memo.get_or_compute(('individual', utils.filter_key(cursos=c)), lambda: calcular(c))
+                             for c in pedidos], repeat=1)
+    stats = memo.stats()
+    print(f"{n_rows:>10,} linhas, {n_requests} reruns | sem cache: {t_sem:8.3f}s | com cache: {t_com:8.3f}s "
+          f"({stats['hits']} acertos, {stats['misses']} faltas, {stats['evictions']} descartes)")
+
+
+def bench_filter_index(n_rows):
+    """Compara a máscara por comparação de valores com a seleção pelo FilterIndex"""
+    df = utils.process_raw_data(generate_sample(n_rows))[utils.CUBE_DIMENSIONS]
+    t_build = _timeit(lambda: utils.FilterIndex(df), repeat=1)
+    indice = utils.FilterIndex(df)
+    datas = df['Data'].sort_values()
+    filtros = {'date_range': (datas.iloc[n_rows // 4], datas.iloc[n_rows // 2]),
+               'cursos': 'Curso 3', 'diretores': ['DIRETOR 1', 'DIRETOR 2']}
+
+    # Seleção múltipla com exclusões, como nos filtros da sidebar
+    multiplos = {'cursos': [f"Curso {i}" for i in range(10)], 'status': 'Presente',
+                 'exclude': {'diretores': [f"DIRETOR {i}" for i in range(5)]}}
+
+    for nome, f in (('período + curso + diretores', filtros), ('10 cursos + status - 5 diretores', multiplos)):
+        t_mask = _timeit(lambda: utils.filter_mask(df, **f), repeat=20)
+        t_index = _timeit(lambda: indice.select(**f), repeat=20)
+        print(f"{n_rows:>10,} linhas (índice em {t_build:.3f}s) | {nome:<33} | comparação de valores: "
+              f"{t_mask * 1000:8.3f}ms | FilterIndex: {t_index * 1000:8.3f}ms")
+
+
+def _distribution_loop(valores, n_bins=20):
+    """Implementação anterior do histograma do panorama: duas máscaras por intervalo"""
+    df = pd.DataFrame({'v': valores})
+    min_val, max_val = df['v'].min(), df['v'].max()
+    largura = (max_val - min_val) / n_bins
+    for i in range(n_bins):
+        inicio, fim = min_val + i * largura, min_val + (i + 1) * largura
+        len(df[(df['v'] >= inicio) & ((df['v'] < fim) if i < n_bins - 1 else (df['v'] <= fim))])
+
+
+def bench_distribution(n_rows):
+    """Compara o laço de 20 máscaras com utils.distribution"""
+    df = utils.process_raw_data(generate_sample(n_rows))
+    valores = df.loc[df['Presente'] == 1, '% Participação']
+    t_loop = _timeit(lambda: _distribution_loop(valores))
+    t_vetor = _timeit(lambda: utils.distribution(valores, bins=20))
+    print(f"{n_rows:>10,} linhas | 20 máscaras: {t_loop:8.3f}s | distribution: {t_vetor:8.3f}s")
+
+
+def bench_drill_down(n_rows, n_lookups=50):
+    """Compara o detalhamento por varredura da base com o GroupIndex"""
+    df = utils.process_raw_data(generate_sample(n_rows))
+    indice = utils.GroupIndex(df)
+    participantes = df['Participante'].drop_duplicates().iloc[:n_lookups].tolist()
+
+    t_scan = _timeit(lambda: [df[df['Participante'] == p] for p in participantes], repeat=1)
+    t_index = _timeit(lambda: [df.take(indice.rows('Participante', p)) for p in participantes], repeat=1)
+    print(f"{n_rows:>10,} linhas, {n_lookups} participantes | varredura: {t_scan:8.3f}s | "
+          f"GroupIndex: {t_index:8.3f}s")
+
+
+def bench_name_search(n_names, limit=100):
+    """Compara str.contains + ordenação da lista inteira com o NameSearchIndex"""
+    rng = np.random.default_rng(0)
+    prenomes = np.array(['JOSÉ', 'MARIA', 'JOÃO', 'ANA', 'LUÍS', 'JULIANA', 'MARCOS', 'PATRÍCIA', 'ANDRÉ', 'CAMILA'])
+    sobrenomes = np.array(['SILVA', 'SOUZA', 'CONCEIÇÃO', 'ARAÚJO', 'FERREIRA', 'PEREIRA', 'GONÇALVES', 'RIBEIRO'])
+    nomes = pd.Series([f"{a} {b} {c} {i}" for i, (a, b, c) in enumerate(zip(
+        rng.choice(prenomes, n_names), rng.choice(sobrenomes, n_names), rng.choice(sobrenomes, n_names)))])
+    t_build = _timeit(lambda: utils.NameSearchIndex(nomes), repeat=1)
+    indice = utils.NameSearchIndex(nomes)
+    consultas = ['jo', 'conceicao', 'ARAÚJO', 'patricia silva', 'gonçal']
+
+    t_contains = _timeit(lambda: [sorted(nomes[nomes.str.contains(q, case=False)].tolist())[:limit] for q in consultas])
+    t_index = _timeit(lambda: [indice.search(q, limit=limit) for q in consultas])
+    print(f"{n_names:>10,} nomes (índice em {t_build:.3f}s) | str.contains + sorted: "
+          f"{t_contains / len(consultas) * 1000:8.2f}ms | NameSearchIndex: {t_index / len(consultas) * 1000:8.2f}ms por busca")
+
+
+def bench_top_n(n_participants):
+    """Compara ordenação completa, nlargest e utils.top_n nos rankings de participantes"""
+    rng = np.random.default_rng(0)
+    metrics = pd.DataFrame({
+        'Participante': [f"PARTICIPANTE {i}" for i in range(n_participants)],
+        'Media_Participacao': rng.integers(0, 10_000, n_participants) / 100,
+        'Taxa_Presenca': rng.integers(0, 101, n_participants).astype(float),
+    })
+    colunas = ['Media_Participacao', 'Taxa_Presenca']
+
+    t_sort = _timeit(lambda: [metrics.sort_values(c, ascending=False, kind='stable').head(10) for c in colunas])
+    t_nlargest = _timeit(lambda: [metrics.nlargest(10, c) for c in colunas])
+    t_top = _timeit(lambda: utils.top_n(metrics, colunas, n=10))
+    print(f"{n_participants:>10,} participantes | sort_values: {t_sort * 1000:8.2f}ms | "
+          f"nlargest: {t_nlargest * 1000:8.2f}ms | top_n: {t_top * 1000:8.2f}ms")
+
+
+def bench_sketches(n_rows):
+    """Compara quantis exatos com os sketches de utils.build_sketches"""
+    df = utils.process_raw_data(generate_sample(n_rows))
+    presentes = df.loc[df['Presente'] == 1, '% Participação'].dropna().to_numpy()
+    qs = np.linspace(0.01, 0.99, 99)
+
+    t_exact = _timeit(lambda: np.quantile(presentes, qs))
+    t_build = _timeit(lambda: utils.build_sketches(df), repeat=1)
+    sketches = utils.build_sketches(df)
+    total = sketches[('% Participação', 'Total', None)]
+    metade = len(df) // 2
+    t_merge = _timeit(lambda: utils.merge_sketches(utils.build_sketches(df.iloc[:metade]),
+                                                   utils.build_sketches(df.iloc[metade:])), repeat=1)
+    erro = np.abs(np.searchsorted(np.sort(presentes), total.quantile(qs)) / len(presentes) - qs).max()
+    itens = sum(sk.size for sk in sketches.values())
+    print(f"{n_rows:>10,} linhas | quantis exatos: {t_exact * 1000:8.1f}ms | "
+          f"build_sketches: {t_build * 1000:8.1f}ms ({len(sketches)} sketches, {itens:,} itens) | "
+          f"merge de 2 metades: {t_merge * 1000:8.1f}ms | erro máx de posição: {erro:.4f}")
+
+
+def bench_sessions(n_rows):
+    """Compara a linha do tempo de um curso agrupando linhas com a tabela de sessões"""
+    df = utils.process_raw_data(generate_sample(n_rows))
+    curso = df['Curso'].iloc[0]
+    t_build = _timeit(lambda: utils.get_session_metrics(df), repeat=1)
+    sessions = utils.get_session_metrics(df)
+
+    t_rows = _timeit(lambda: utils.get_time_series_metrics(df[df['Curso'] == curso]))
+    t_sessions = _timeit(lambda: sessions[sessions['Curso'] == curso])
+    print(f"{n_rows:>10,} linhas ({len(sessions):,} sessões, construção {t_build:.3f}s) | "
+          f"linha do tempo de um curso pelas linhas: {t_rows * 1000:8.2f}ms | pela tabela de sessões: {t_sessions * 1000:8.2f}ms")
+
+
+def bench_downsampling(n_points, max_points=2000):
+    """Compara a série completa com a reduzida por utils.lttb (tempo e tamanho do gráfico)"""
+    rng = np.random.default_rng(0)
+    serie = pd.DataFrame({
+        'Data': pd.date_range('2000-01-01', periods=n_points, freq='D'),
+        'Taxa_Presenca': np.clip(70 + np.cumsum(rng.normal(0, 1, n_points)), 0, 100),
+    })
+
+    t_lttb = _timeit(lambda: utils.downsample(serie, 'Data', 'Taxa_Presenca', max_points))
+    reduzida = utils.downsample(serie, 'Data', 'Taxa_Presenca', max_points)
+    completo = json.dumps({'x': serie['Data'].astype(str).tolist(), 'y': serie['Taxa_Presenca'].tolist()})
+    reduzido = json.dumps({'x': reduzida['Data'].astype(str).tolist(), 'y': reduzida['Taxa_Presenca'].tolist()})
+    print(f"{n_points:>10,} pontos | lttb -> {len(reduzida):,} pontos: {t_lttb * 1000:8.2f}ms | "
+          f"dados do traço: {len(completo) / 1024:8.1f}KB -> {len(reduzido) / 1024:6.1f}KB")
+
+
+def bench_paged_table(n_rows, page_size=50):
+    """Compara o Styler.background_gradient da tabela inteira com uma página colorida por utils.color_bins"""
+    rng = np.random.default_rng(0)
+    colunas = ['Taxa_Presenca', 'Media_Participacao', 'Taxa_Pesquisa']
+    df = pd.DataFrame({'Participante': [f"PARTICIPANTE {i}" for i in range(n_rows)]})
+    for col in colunas:
+        df[col] = rng.integers(0, 10_000, n_rows) / 100
+
+    def completa():
+        df.sort_values('Media_Participacao', ascending=False).style.background_gradient(
+            subset=colunas, cmap='RdYlGn')._compute()
+
+    estilos_nivel = np.array([f"background-color: #{i:06x};" for i in range(20)], dtype=object)
+    def paginada():
+        niveis = pd.DataFrame({col: utils.color_bins(df[col], 20) for col in colunas}, index=df.index)
+        pagina = df.sort_values('Media_Participacao', ascending=False, kind='stable').iloc[:page_size]
+        estilos = pd.DataFrame('', index=pagina.index, columns=pagina.columns)
+        for col in colunas:
+            estilos[col] = estilos_nivel[niveis.loc[pagina.index, col].to_numpy()]
+        pagina.style.apply(lambda _: estilos, axis=None)._compute()
+
+    t_full = _timeit(completa, repeat=1)
+    t_page = _timeit(paginada)
+    print(f"{n_rows:>10,} linhas | Styler da tabela inteira: {t_full * 1000:9.1f}ms | "
+          f"página de {page_size} com níveis de cor: {t_page * 1000:7.1f}ms")
+
+
+def check_top_n(n_cases=300):
+    """utils.top_n devolve as mesmas linhas, na mesma ordem, que nlargest/nsmallest"""
+    rng = np.random.default_rng(0)
+    for _ in range(n_cases):
+        tamanho = int(rng.integers(0, 60))
+        # Poucos valores distintos e alguns nulos: muitos empates
+        valores = rng.integers(0, 6, tamanho).astype(float)
+        valores[rng.random(tamanho) < 0.2] = np.nan
+        df = pd.DataFrame({'v': valores}, index=rng.permutation(tamanho) * 10)
+        n = int(rng.integers(1, 15))
+        for largest, referencia in ((True, df.nlargest(n, 'v')), (False, df.nsmallest(n, 'v'))):
+            obtido = utils.top_n(df, 'v', n=n, largest=largest)['v']
+            assert obtido.index.tolist() == referencia.index.tolist(), (n, largest, valores)
+
+
+def check_filter_index(n_rows=20_000, n_cases=300):
+    """FilterIndex.select tem a mesma máscara que filter_mask, inclusive nas bordas dos checkpoints de datas"""
+    rng = np.random.default_rng(0)
+    df = utils.process_raw_data(generate_sample(n_rows))[utils.CUBE_DIMENSIONS]
+    # Datas ausentes, fora das checagens por bitmap
+    df.loc[rng.random(n_rows) < 0.01, 'Data'] = pd.NaT
+    indice = utils.FilterIndex(df)
+    datas = indice._datas
+    # Períodos que começam e terminam exatamente nos checkpoints e um dia antes/depois
+    bordas = datas[np.arange(0, len(datas), indice._passo)]
+    candidatas = np.concatenate([datas, bordas, bordas - np.timedelta64(1, 'D'), bordas + np.timedelta64(1, 'D'),
+                                 [datas[0] - np.timedelta64(30, 'D'), datas[-1] + np.timedelta64(30, 'D')]])
+    cursos = df['Curso'].unique().tolist() + ['Curso inexistente']
+    diretores = df['Diretor'].unique().tolist()
+
+    def amostra(valores):
+        return [str(v) for v in rng.choice(valores, int(rng.integers(1, 4)), replace=False)]
+
+    for _ in range(n_cases):
+        filtros = {}
+        if rng.random() < 0.8:
+            inicio, fim = rng.choice(candidatas, 2)
+            filtros['date_range'] = (inicio, fim) if rng.random() < 0.9 else (fim, inicio)
+        if rng.random() < 0.5:
+            filtros['cursos'] = amostra(cursos)
+        if rng.random() < 0.3:
+            filtros['diretores'] = amostra(diretores)[0]
+        if rng.random() < 0.3:
+            filtros['status'] = 'Presente'
+        if rng.random() < 0.3:
+            filtros['exclude'] = {'diretores': amostra(diretores)}
+        assert np.array_equal(indice.select(**filtros), utils.filter_mask(df, **filtros)), filtros
+
+
+def check_sketches(n_values=200_000, k=200):
+    """QuantileSketch: erro de posição limitado, merge equivalente e média/desvio exatos"""
+    rng = np.random.default_rng(0)
+    valores = rng.normal(70, 20, n_values)
+    valores[rng.random(n_values) < 0.05] = np.nan
+    validos = np.sort(valores[~np.isnan(valores)])
+    qs = np.linspace(0.01, 0.99, 99)
+
+    def erro_posicao(sketch):
+        return np.abs(np.searchsorted(validos, sketch.quantile(qs)) / len(validos) - qs).max()
+
+    inteiro = utils.QuantileSketch(k=k).update(valores)
+    metade = n_values // 2
+    combinado = utils.QuantileSketch(k=k).update(valores[:metade]).merge(
+        utils.QuantileSketch(k=k, seed=1).update(valores[metade:]))
+    for sketch in (inteiro, combinado):
+        assert len(sketch) == len(validos)
+        assert erro_posicao(sketch) < 0.02, erro_posicao(sketch)
+        assert np.isclose(sketch.mean, pd.Series(valores).mean())
+        assert np.isclose(sketch.std, pd.Series(valores).std())
+        assert (sketch.min, sketch.max) == (validos[0], validos[-1])
+
+
+def check_name_search(n_names=2_000):
+    """NameSearchIndex.matches é o str.contains sem acentos; search começa pelos prefixos e contém matches"""
+    rng = np.random.default_rng(0)
+    prenomes = np.array(['JOSÉ', 'MARIA', 'JOÃO', 'ANA', 'LUÍS', 'JULIANA', 'MARCOS', 'PATRÍCIA', 'ANDRÉ', 'CAMILA'])
+    sobrenomes = np.array(['SILVA', 'SOUZA', 'CONCEIÇÃO', 'ARAÚJO', 'FERREIRA', 'PEREIRA', 'GONÇALVES', 'RIBEIRO'])
+    nomes = pd.Series([f"{a} {b} {c} {i}" for i, (a, b, c) in enumerate(zip(
+        rng.choice(prenomes, n_names), rng.choice(sobrenomes, n_names), rng.choice(sobrenomes, n_names)))])
+    indice = utils.NameSearchIndex(nomes)
+    normalizados = nomes.map(utils.normalize_name)
+    consultas = ['jo', 'a', 'conceicao', 'ARAÚJO', 'patricia silva', 'gonçal', 'ra', ' Silva  Souza ', '12', 'xyz', '']
+
+    for consulta in consultas:
+        q = utils.normalize_name(consulta)
+        contem = sorted(nomes[normalizados.str.contains(q, regex=False)])
+        assert indice.matches(consulta) == contem, consulta
+
+        prefixo = normalizados.str.startswith(q) | normalizados.str.contains(' ' + q, regex=False)
+        resultado = indice.search(consulta, limit=None)
+        n_prefixos = int(prefixo.sum())
+        assert resultado[:n_prefixos] == sorted(nomes[prefixo]), consulta
+        assert set(contem) <= set(resultado), consulta
+        assert resultado[:len(contem)] == resultado[:n_prefixos] + sorted(set(contem) - set(nomes[prefixo])), consulta
+
+        # among restringe sem mudar a ordem
+        among = set(nomes.iloc[::3])
+        assert indice.search(consulta, limit=None, among=among) == [n for n in resultado if n in among], consulta
+
+
+if __name__ == "__main__":
+    print("Verificações contra as referências do pandas")
+    for check in (check_top_n, check_filter_index, check_sketches, check_name_search):
+        check()
+        print(f"  {check.__name__}: ok")
+    if "--check" in sys.argv:
+        sys.exit(0)
+
+    print("\nConversão de tempos e colunas binárias")
+    for n in (100_000, 1_000_000):
+        bench_parsing(n)
+
+    print("\nTipos compactos (memória e agrupamentos)")
+    for n in (100_000, 1_000_000):
+        bench_schema(n)
+
+    print("\nLeitura em blocos (pico de memória do processo)")
+    for n in (500_000, 1_000_000, 2_000_000):
+        bench_streaming(n)
+
+    print("\nVários arquivos mensais")
+    for n in (4, 12):
+        bench_dataset(n, 200_000)
+
+    print("\nUploads incrementais (cache em partes)")
+    for n in (200_000, 1_000_000):
+        bench_append(n)
+
+    print("\nFiltro de curso no SQLite")
+    for n in (100_000, 1_000_000):
+        bench_sqlite(n)
+
+    print("\nCarga de colunas sob demanda (série temporal)")
+    for n in (100_000, 1_000_000):
+        bench_lazy(n)
+
+    print("\nAgregação única das visões de métricas")
+    for n in (100_000, 1_000_000):
+        bench_fused(n)
+
+    print("\nCubo de métricas (filtros da sidebar)")
+    for n in (100_000, 1_000_000):
+        bench_cube(n)
+
+    print("\nCache de métricas por filtro (LRU + TTL)")
+    for n in (100_000, 1_000_000):
+        bench_memo(n)
+
+    print("\nÍndice dos filtros da sidebar (bitmaps e datas ordenadas)")
+    for n in (100_000, 1_000_000):
+        bench_filter_index(n)
+
+    print("\nDistribuição de % Participação (histograma do panorama)")
+    for n in (100_000, 1_000_000):
+        bench_distribution(n)
+
+    print("\nDetalhamento por participante (índice de linhas por grupo)")
+    for n in (100_000, 1_000_000):
+        bench_drill_down(n)
+
+    print("\nBusca de participantes (prefixo + trigramas)")
+    for n in (10_000, 100_000):
+        bench_name_search(n)
+
+    print("\nRankings de participantes (top 10 de duas métricas)")
+    for n in (10_000, 100_000, 1_000_000):
+        bench_top_n(n)
+
+    print("\nSketches de quantis (% Participação por curso, diretor e mês)")
+    for n in (100_000, 1_000_000):
+        bench_sketches(n)
+
+    print("\nTabela de sessões (Data × Curso)")
+    for n in (100_000, 1_000_000):
+        bench_sessions(n)
+
+    print("\nRedução de séries temporais (LTTB)")
+    for n in (10_000, 100_000, 1_000_000):
+        bench_downsampling(n)
+
+    print("\nTabelas paginadas (gradiente de cores)")
+    for n in (1_000, 10_000, 100_000):
+        bench_paged_table(n)
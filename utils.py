@@ -1,75 +1,531 @@
 import pandas as pd
+import numpy as np
+import codecs
+import fnmatch
+import hashlib
+import io
+import json
 import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def load_data(csv_path=None):
-    """Carrega e processa os dados do CSV"""
+# Formatos H:MM:SS e H:MM com dígitos simples; qualquer outro valor cai no
+# conversor linha a linha, preservando exatamente o comportamento anterior
+_TIME_PATTERN = r'^([0-9]+):([0-9]+)(?::([0-9]+))?$'
+
+# Colunas do CSV de origem, na ordem do arquivo
+RAW_COLUMNS = [
+    'Data', 'Participante', 'Diretor', 'Curso', 'Duração',
+    'Participação', '% Participação', '% Câmera aberta',
+    'Respondeu a Pesquisa de Satisfação?', 'Status', 'Motivo Ausência'
+]
+
+# Encodings aceitos no upload, em ordem de preferência
+UPLOAD_ENCODINGS = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
+
+# Chave de um registro de presença, usada para remover duplicatas entre arquivos
+RECORD_KEY = ['Data', 'Participante', 'Curso']
+
+# Cache colunar do DataFrame já processado (um .parquet + .json por CSV)
+CACHE_DIR_NAME = '.cache'
+# Incrementar sempre que as colunas derivadas ou os tipos de load_data mudarem
+_CACHE_VERSION = 5
+
+# Tipos compactos aplicados após o processamento: textos repetitivos como
+# categorias, flags 0/1 em int8 e percentuais em float32. Os minutos ficam em
+# float64 porque as somas alimentam as médias ponderadas de participação.
+DTYPE_SCHEMA = {
+    'Participante': 'category',
+    'Diretor': 'category',
+    'Curso': 'category',
+    'Status': 'category',
+    'Motivo Ausência': 'category',
+    'Respondeu a Pesquisa de Satisfação?': 'category',
+    'Duração': 'category',
+    '% Participação': 'float32',
+    '% Câmera aberta': 'float32',
+    'Respondeu_Pesquisa': 'int8',
+    'Presente': 'int8'
+}
+
+def find_data_file():
+    """Procura o CSV de dados pelas variações conhecidas do nome do arquivo"""
+    # Tentar diferentes variações do nome do arquivo
+    possible_names = [
+        'Base_Dados_Cursos.csv',
+        'Base_Dados_Cursos.CSV',
+        'base_dados_cursos.csv',
+        'BASE_DADOS_CURSOS.CSV'
+    ]
+    
+    for name in possible_names:
+        if os.path.exists(name):
+            return name
+    
+    # Se ainda não encontrou, tentar no diretório atual
+    current_dir = Path(__file__).parent if '__file__' in globals() else Path.cwd()
+    for name in possible_names:
+        full_path = current_dir / name
+        if full_path.exists():
+            return str(full_path)
+    
+    # Se ainda não encontrou, usar o nome padrão e deixar o erro acontecer
+    return 'Base_Dados_Cursos.csv'
+
+def load_data(csv_path=None, use_cache=True):
+    """Carrega e processa os dados do CSV
+    
+    Com use_cache=True o DataFrame processado é lido do cache Parquet quando
+    a impressão digital do CSV (tamanho, mtime e hash) não mudou.
+    """
     # Se não foi fornecido um caminho, tentar encontrar o arquivo
     if csv_path is None:
-        # Tentar diferentes variações do nome do arquivo
-        possible_names = [
-            'Base_Dados_Cursos.csv',
-            'Base_Dados_Cursos.CSV',
-            'base_dados_cursos.csv',
-            'BASE_DADOS_CURSOS.CSV'
-        ]
-        
-        csv_path = None
-        for name in possible_names:
-            if os.path.exists(name):
-                csv_path = name
-                break
-        
-        # Se ainda não encontrou, tentar no diretório atual
-        if csv_path is None:
-            current_dir = Path(__file__).parent if '__file__' in globals() else Path.cwd()
-            for name in possible_names:
-                full_path = current_dir / name
-                if full_path.exists():
-                    csv_path = str(full_path)
-                    break
-        
-        # Se ainda não encontrou, usar o nome padrão e deixar o erro acontecer
-        if csv_path is None:
-            csv_path = 'Base_Dados_Cursos.csv'
+        csv_path = find_data_file()
     
     # Verificar se o arquivo existe
     if not os.path.exists(csv_path):
         # Criar DataFrame vazio com a estrutura correta se o arquivo não existir
         # Isso permite que o app inicie mesmo sem o arquivo, e o usuário pode fazer upload
-        df = pd.DataFrame(columns=[
-            'Data', 'Participante', 'Diretor', 'Curso', 'Duração', 
-            'Participação', '% Participação', '% Câmera aberta', 
-            'Respondeu a Pesquisa de Satisfação?', 'Status', 'Motivo Ausência'
-        ])
+        df = pd.DataFrame(columns=RAW_COLUMNS)
         return df
     
+    if use_cache:
+        df = read_parsed_cache(csv_path)
+        if df is not None:
+            return df
+    
+    df = parse_csv(csv_path)
+    
+    if use_cache:
+        write_parsed_cache(csv_path, df)
+    
+    return df
+
+def parse_csv(csv_path):
+    """Lê o CSV e cria as colunas derivadas, sem passar pelo cache"""
     df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
+    # Uploads incrementais podem acrescentar novas versões de um registro
+    return drop_duplicate_records(process_raw_data(df))
+
+def process_raw_data(df, compact=True):
+    """Cria as colunas derivadas a partir das colunas brutas do CSV
     
-    # Converter data
-    df['Data'] = pd.to_datetime(df['Data'], format='%d/%m/%Y', errors='coerce')
+    Com compact=True os tipos de DTYPE_SCHEMA são aplicados ao final.
+    """
+    for col in PROCESSED_SOURCES:
+        df[col] = derive_column(df, col)
     
-    # Processar % Participação (remover % e converter para float)
-    df['% Participação'] = df['% Participação'].astype(str).str.replace('%', '').str.replace(',', '.').str.replace('nan', '0')
-    df['% Participação'] = pd.to_numeric(df['% Participação'], errors='coerce').fillna(0)
+    return apply_schema(df) if compact else df
+
+# Coluna bruta de origem de cada coluna convertida ou derivada em load_data
+PROCESSED_SOURCES = {
+    'Data': 'Data',
+    '% Participação': '% Participação',
+    '% Câmera aberta': '% Câmera aberta',
+    'Participação_minutos': 'Participação',
+    'Duração_minutos': 'Duração',
+    'Respondeu_Pesquisa': 'Respondeu a Pesquisa de Satisfação?',
+    'Presente': 'Status'
+}
+
+def derive_column(df, col):
+    """Calcula uma coluna processada a partir da sua coluna bruta em df"""
+    origem = df[PROCESSED_SOURCES[col]]
     
-    # Processar % Câmera aberta
-    df['% Câmera aberta'] = df['% Câmera aberta'].astype(str).str.replace('%', '').str.replace(',', '.').str.replace('nan', '')
-    df['% Câmera aberta'] = pd.to_numeric(df['% Câmera aberta'], errors='coerce')
+    if col == 'Data':
+        # Converter data
+        return pd.to_datetime(origem, format='%d/%m/%Y', errors='coerce')
     
-    # Converter Participação para minutos
-    df['Participação_minutos'] = df['Participação'].apply(convert_time_to_minutes)
+    if col == '% Participação':
+        # Processar % Participação (remover % e converter para float)
+        valores = origem.astype(str).str.replace('%', '').str.replace(',', '.').str.replace('nan', '0')
+        return pd.to_numeric(valores, errors='coerce').fillna(0)
     
-    # Converter Duração para minutos
-    df['Duração_minutos'] = df['Duração'].apply(convert_time_to_minutes)
+    if col == '% Câmera aberta':
+        # Processar % Câmera aberta
+        valores = origem.astype(str).str.replace('%', '').str.replace(',', '.').str.replace('nan', '')
+        return pd.to_numeric(valores, errors='coerce')
     
-    # Criar coluna binária para pesquisa
-    df['Respondeu_Pesquisa'] = df['Respondeu a Pesquisa de Satisfação?'].apply(lambda x: 1 if x == 'Sim' else 0)
+    if col in ('Participação_minutos', 'Duração_minutos'):
+        # Converter Participação/Duração para minutos
+        return convert_time_series_to_minutes(origem)
+    
+    if col == 'Respondeu_Pesquisa':
+        # Criar coluna binária para pesquisa
+        return (origem == 'Sim').astype(int)
     
     # Criar coluna binária para presença
-    df['Presente'] = df['Status'].apply(lambda x: 1 if x == 'Presente' else 0)
+    return (origem == 'Presente').astype(int)
+
+def detect_encoding(sample, encodings=UPLOAD_ENCODINGS):
+    """Detecta o encoding a partir de uma amostra de bytes do arquivo"""
+    for encoding in encodings:
+        # Decodificador incremental: um caractere cortado no fim da amostra não é erro
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+def read_csv_bytes(data, sample_size=64 * 1024):
+    """Lê um CSV em memória com uma única passada
     
-    return df
+    O encoding é detectado uma vez a partir dos primeiros bytes. Retorna
+    (DataFrame, encoding), ou (None, None) se o arquivo não puder ser lido.
+    """
+    encoding = detect_encoding(data[:sample_size])
+    if encoding is None:
+        return None, None
+    
+    try:
+        try:
+            return pd.read_csv(io.BytesIO(data), sep=';', encoding=encoding), encoding
+        except UnicodeDecodeError:
+            # A amostra era UTF-8 válido mas o restante não: latin-1 aceita qualquer byte
+            return pd.read_csv(io.BytesIO(data), sep=';', encoding='latin-1'), 'latin-1'
+    except (pd.errors.EmptyDataError, pd.errors.ParserError):
+        # Arquivo vazio (ou só com espaços) ou com estrutura inválida
+        return None, None
+
+def apply_schema(df):
+    """Converte as colunas do DataFrame para os tipos compactos de DTYPE_SCHEMA"""
+    tipos = {col: dtype for col, dtype in DTYPE_SCHEMA.items() if col in df.columns}
+    return df.astype(tipos)
+
+def memory_footprint(df):
+    """Retorna o uso de memória do DataFrame em bytes (incluindo textos)"""
+    return int(df.memory_usage(deep=True).sum())
+
+def _cache_paths(csv_path):
+    """Retorna os caminhos do arquivo Parquet e dos metadados do cache"""
+    csv_path = Path(csv_path)
+    cache_dir = csv_path.parent / CACHE_DIR_NAME
+    return cache_dir / f'{csv_path.name}.parquet', cache_dir / f'{csv_path.name}.json'
+
+def _keys_path(csv_path):
+    """Arquivo com o hash de 64 bits da chave de cada linha do cache"""
+    parquet_path, _ = _cache_paths(csv_path)
+    return parquet_path.with_name(f'{Path(csv_path).name}.keys')
+
+def _part_paths(csv_path, numero):
+    """Parquet de uma parte anexada e o arquivo das linhas que ela substitui"""
+    parquet_path, _ = _cache_paths(csv_path)
+    nome = Path(csv_path).name
+    return parquet_path.with_name(f'{nome}.part{numero}.parquet'), parquet_path.with_name(f'{nome}.part{numero}.removed.npy')
+
+def _file_hash(path, chunk_size=1024 * 1024, start=0):
+    """Calcula o SHA-256 do conteúdo do arquivo (a partir do byte start)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_fingerprint(path):
+    """Impressão digital do arquivo: tamanho, mtime e hash do conteúdo"""
+    stat = os.stat(path)
+    return {
+        'version': _CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _file_hash(path)
+    }
+
+def key_hashes(df):
+    """Hash de 64 bits da chave RECORD_KEY de cada linha"""
+    chaves = df[RECORD_KEY].assign(Data=df['Data'].astype('datetime64[ns]'))
+    return pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+
+def _valid_cache_meta(csv_path):
+    """Metadados do cache se ele corresponder ao CSV, senão None"""
+    parquet_path, meta_path = _cache_paths(csv_path)
+    if not parquet_path.exists() or not meta_path.exists():
+        return None
+    
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        stat = os.stat(csv_path)
+        if meta.get('version') != _CACHE_VERSION or meta.get('size') != stat.st_size:
+            return None
+        
+        # mtime diferente não invalida sozinho: confirmar pelo hash do conteúdo
+        if meta.get('mtime_ns') != stat.st_mtime_ns:
+            if meta.get('sha256') != _file_hash(csv_path):
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            meta_path.write_text(json.dumps(meta), encoding='utf-8')
+    except (OSError, ValueError):
+        return None
+    
+    return meta
+
+def valid_cache_path(csv_path):
+    """Retorna o caminho do Parquet se o cache corresponder ao CSV, senão None"""
+    if _valid_cache_meta(csv_path) is None:
+        return None
+    return _cache_paths(csv_path)[0]
+
+def _read_cache_parts(csv_path, meta, columns=None):
+    """Lê o Parquet base e as partes anexadas, sem as linhas substituídas"""
+    parquet_path, _ = _cache_paths(csv_path)
+    frames = [pd.read_parquet(parquet_path, columns=columns)]
+    removidas = []
+    for numero in range(1, meta['parts']):
+        parte, removidas_parte = _part_paths(csv_path, numero)
+        frames.append(pd.read_parquet(parte, columns=columns))
+        removidas.append(np.load(removidas_parte))
+    if len(frames) == 1:
+        return frames[0]
+    
+    df = concat_frames(frames)
+    manter = np.ones(len(df), dtype=bool)
+    manter[np.concatenate(removidas)] = False
+    return df[manter].reset_index(drop=True)
+
+def read_parsed_cache(csv_path, columns=None):
+    """Lê o DataFrame processado do cache, ou None se não houver cache válido"""
+    meta = _valid_cache_meta(csv_path)
+    if meta is None:
+        return None
+    
+    try:
+        return _read_cache_parts(csv_path, meta, columns)
+    except Exception:
+        # Cache corrompido ou pyarrow indisponível: reprocessar o CSV
+        return None
+
+def _remove_cache_parts(csv_path):
+    """Remove as partes anexadas ao cache (de qualquer versão dos metadados)"""
+    parquet_path, _ = _cache_paths(csv_path)
+    prefixo = f'{Path(csv_path).name}.part'
+    if not parquet_path.parent.is_dir():
+        return
+    for path in parquet_path.parent.iterdir():
+        if path.name.startswith(prefixo):
+            path.unlink(missing_ok=True)
+
+def write_parsed_cache(csv_path, df):
+    """Grava o DataFrame processado no cache Parquet ao lado do CSV
+    
+    Junto do Parquet fica o hash da chave de cada linha, usado por
+    append_records para achar os registros substituídos sem ler a base.
+    """
+    parquet_path, meta_path = _cache_paths(csv_path)
+    try:
+        parquet_path.parent.mkdir(exist_ok=True)
+        meta = file_fingerprint(csv_path)
+        meta.update(parts=1, rows=len(df))
+        meta_path.unlink(missing_ok=True)
+        _remove_cache_parts(csv_path)
+        tmp_path = parquet_path.with_suffix('.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+        key_hashes(df).tofile(_keys_path(csv_path))
+        meta_path.write_text(json.dumps(meta), encoding='utf-8')
+    except Exception:
+        # O cache é apenas uma otimização; falhas de escrita não impedem a carga
+        pass
+
+def invalidate_parsed_cache(csv_path):
+    """Remove o cache Parquet (com as partes anexadas e os sketches) associado ao CSV"""
+    for path in (*_cache_paths(csv_path), _keys_path(csv_path), _sketch_cache_path(csv_path)):
+        path.unlink(missing_ok=True)
+    _remove_cache_parts(csv_path)
+
+# Meses abreviados aceitos nos nomes dos snapshots (Base_Dados_Cursos_Nov_2025.csv)
+SNAPSHOT_MONTHS = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+
+def snapshot_period(path):
+    """(ano, mês) do snapshot a partir do nome do arquivo, ou None
+    
+    Aceita o mês abreviado em português seguido do ano (_Nov_2025) e as
+    formas numéricas _2025_11, _2025-11 e _11_2025.
+    """
+    nome = Path(path).stem.lower()
+    achado = re.search(r'(' + '|'.join(SNAPSHOT_MONTHS) + r')[a-zç]*[_\- ]?(\d{4})', nome)
+    if achado:
+        return int(achado.group(2)), SNAPSHOT_MONTHS.index(achado.group(1)) + 1
+    achado = re.search(r'(\d{4})[_\-](\d{1,2})(?!\d)', nome)
+    if achado and 1 <= int(achado.group(2)) <= 12:
+        return int(achado.group(1)), int(achado.group(2))
+    achado = re.search(r'(?<!\d)(\d{1,2})[_\-](\d{4})', nome)
+    if achado and 1 <= int(achado.group(1)) <= 12:
+        return int(achado.group(2)), int(achado.group(1))
+    return None
+
+def find_dataset_files(directory=None, pattern='base_dados_cursos*.csv'):
+    """Lista os snapshots mensais do diretório, do mais antigo ao mais recente
+    
+    A comparação com o padrão ignora maiúsculas/minúsculas, então tanto
+    Base_Dados_Cursos.CSV quanto Base_Dados_Cursos_Nov_2025.csv são encontrados.
+    A ordem vem do período no nome (snapshot_period), não da data de
+    modificação; arquivos sem período, como a base atual que recebe os
+    uploads, vêm depois de todos os snapshots. Empates seguem o nome.
+    """
+    if directory is None:
+        directory = Path(find_data_file()).resolve().parent
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    
+    arquivos = [p for p in directory.iterdir()
+                if p.is_file() and fnmatch.fnmatch(p.name.lower(), pattern.lower())]
+    def ordem(p):
+        periodo = snapshot_period(p)
+        return (periodo is None, periodo or (0, 0), p.name)
+    return sorted(arquivos, key=ordem)
+
+def load_dataset(directory=None, pattern='base_dados_cursos*.csv', max_workers=None, use_cache=True):
+    """Carrega e une todos os snapshots mensais de um diretório
+    
+    Cada arquivo é processado em paralelo em um pool de processos (com o cache
+    Parquet de load_data). Registros repetidos em (Data, Participante, Curso)
+    mantêm a versão do último arquivo na ordem de find_dataset_files.
+    """
+    arquivos = [str(p) for p in find_dataset_files(directory, pattern)]
+    if not arquivos:
+        return pd.DataFrame(columns=RAW_COLUMNS)
+    
+    if len(arquivos) == 1 or max_workers == 1:
+        frames = [load_data(p, use_cache=use_cache) for p in arquivos]
+    else:
+        workers = min(len(arquivos), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(load_data, arquivos, [use_cache] * len(arquivos)))
+    
+    return combine_frames(frames)
+
+def combine_frames(frames):
+    """Une DataFrames já processados e remove duplicatas pela chave RECORD_KEY
+    
+    Em caso de repetição prevalece o registro do último DataFrame da lista.
+    """
+    return drop_duplicate_records(concat_frames(frames))
+
+def concat_frames(frames):
+    """Concatena DataFrames já processados mantendo os tipos de DTYPE_SCHEMA"""
+    frames = [apply_schema(f) for f in frames]
+    
+    # Unificar as categorias antes do concat para não perder o tipo categórico
+    for col, dtype in DTYPE_SCHEMA.items():
+        if dtype != 'category' or col not in frames[0].columns:
+            continue
+        categorias = frames[0][col].cat.categories
+        for f in frames[1:]:
+            categorias = categorias.union(f[col].cat.categories)
+        frames = [f.assign(**{col: f[col].cat.set_categories(categorias)}) for f in frames]
+    
+    return pd.concat(frames, ignore_index=True)
+
+def complete_key(df):
+    """Máscara das linhas com a chave RECORD_KEY completa
+    
+    Linhas sem data, participante ou curso (como as linhas em branco do
+    export) não são registros e ficam fora da base.
+    """
+    return df[RECORD_KEY].notna().all(axis=1)
+
+def drop_duplicate_records(df):
+    """Remove linhas com chave incompleta e registros repetidos pela chave
+    RECORD_KEY, mantendo o último"""
+    descartar = ~complete_key(df) | df.duplicated(subset=RECORD_KEY, keep='last')
+    if not descartar.any():
+        return df
+    return df[~descartar].reset_index(drop=True)
+
+# Partes anexadas ao cache antes de ele ser regravado inteiro em append_records
+MAX_CACHE_PARTS = 16
+
+def append_records(csv_path, raw_df):
+    """Acrescenta registros brutos ao CSV sem reprocessar o histórico
+    
+    Apenas raw_df é processado. As linhas são anexadas ao final do CSV e
+    viram uma nova parte do cache Parquet; os registros antigos com a mesma
+    chave (Data, Participante, Curso) são achados pelo arquivo de hashes
+    das chaves (8 bytes por linha) e marcados como substituídos, sem ler
+    nem regravar o histórico. Sem cache válido, ou com MAX_CACHE_PARTS
+    partes, a base é carregada e o cache regravado inteiro. Retorna um
+    dicionário com os registros 'novos', 'atualizados' e o 'total'.
+    """
+    novos = process_raw_data(raw_df.copy())
+    
+    # Linhas em branco ou sem chave não são anexadas ao CSV
+    completas = complete_key(novos).to_numpy()
+    raw_df = raw_df[completas]
+    novos = drop_duplicate_records(novos[completas])
+    
+    meta = _valid_cache_meta(csv_path)
+    incremental = meta is not None and meta['parts'] < MAX_CACHE_PARTS and _keys_path(csv_path).exists()
+    existente = None if incremental else load_data(csv_path)
+    tamanho_antes = os.path.getsize(csv_path)
+    
+    # Manter a ordem de colunas do arquivo existente
+    colunas = pd.read_csv(csv_path, sep=';', encoding='utf-8', nrows=0).columns
+    with open(csv_path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+    raw_df.reindex(columns=colunas).to_csv(csv_path, sep=';', index=False, header=False,
+                                          mode='a', encoding='utf-8')
+    
+    if incremental:
+        try:
+            return _append_cache_part(csv_path, meta, novos, tamanho_antes)
+        except Exception:
+            # Parte incompleta: descartar o cache e reprocessar o CSV abaixo
+            invalidate_parsed_cache(csv_path)
+            existente = None
+    
+    if existente is None:
+        df = load_data(csv_path)
+        total_antes = meta['rows']
+    else:
+        df = combine_frames([existente, novos])
+        write_parsed_cache(csv_path, df)
+        total_antes = len(existente)
+    inseridos = len(df) - total_antes
+    return {'novos': inseridos, 'atualizados': len(novos) - inseridos, 'total': len(df)}
+
+def _append_cache_part(csv_path, meta, novos, tamanho_antes):
+    """Grava novos como uma parte do cache e marca as linhas que eles substituem"""
+    _, meta_path = _cache_paths(csv_path)
+    parte, removidas_path = _part_paths(csv_path, meta['parts'])
+    keys_path = _keys_path(csv_path)
+    
+    chaves = np.fromfile(keys_path, dtype=np.uint64)
+    hashes = key_hashes(novos)
+    removidas = np.flatnonzero(pd.Series(chaves).isin(hashes).to_numpy())
+    # Linhas já substituídas por uma parte anterior não contam de novo
+    anteriores = [np.load(_part_paths(csv_path, i)[1]) for i in range(1, meta['parts'])]
+    if anteriores:
+        removidas = np.setdiff1d(removidas, np.concatenate(anteriores))
+    
+    meta_path.unlink()
+    novos.to_parquet(parte, index=False)
+    np.save(removidas_path, removidas)
+    with open(keys_path, 'ab') as f:
+        hashes.tofile(f)
+    
+    # O hash do conteúdo passa a encadear o hash anterior e o dos bytes
+    # anexados; um CSV alterado de outra forma não confere e o cache é refeito
+    stat = os.stat(csv_path)
+    anexado = _file_hash(csv_path, start=tamanho_antes)
+    meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, parts=meta['parts'] + 1,
+                rows=meta['rows'] + len(novos) - len(removidas),
+                sha256=hashlib.sha256((meta['sha256'] + anexado).encode()).hexdigest())
+    meta_path.write_text(json.dumps(meta), encoding='utf-8')
+    return {'novos': len(novos) - len(removidas), 'atualizados': len(removidas), 'total': meta['rows']}
 
 def convert_time_to_minutes(time_str):
     """Converte string de tempo (HH:MM:SS) para minutos"""
@@ -89,120 +545,1468 @@ def convert_time_to_minutes(time_str):
     except (ValueError, TypeError):
         return 0
 
-def get_summary_metrics(df):
-    """Calcula métricas gerais de resumo"""
-    total_participantes = len(df)
-    total_presentes = df['Presente'].sum()
-    taxa_presenca = (total_presentes / total_participantes * 100) if total_participantes > 0 else 0
+def convert_time_series_to_minutes(series):
+    """Versão vetorizada de convert_time_to_minutes para uma coluna inteira.
     
-    # Média de participação = soma total de horas de participação / soma total de horas de duração * 100
-    total_participacao_minutos = df['Participação_minutos'].sum()
-    total_duracao_minutos = df['Duração_minutos'].sum()
-    media_participacao = (total_participacao_minutos / total_duracao_minutos * 100) if total_duracao_minutos > 0 else 0
+    Os valores distintos são convertidos uma única vez (as colunas de tempo
+    repetem muito) e o resultado é espalhado de volta pelos códigos.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return pd.Series(0.0, index=series.index)
     
-    total_pesquisas = df['Respondeu_Pesquisa'].sum()
-    taxa_pesquisa = (total_pesquisas / total_presentes * 100) if total_presentes > 0 else 0
+    textos = pd.Series(np.asarray(uniques, dtype=object)).astype(str)
+    partes = textos.str.extract(_TIME_PATTERN)
+    horas = pd.to_numeric(partes[0]).to_numpy(dtype=float)
+    minutos = pd.to_numeric(partes[1]).to_numpy(dtype=float)
+    segundos = pd.to_numeric(partes[2]).to_numpy(dtype=float)
     
-    media_camera = df[df['% Câmera aberta'].notna()]['% Câmera aberta'].mean() if df['% Câmera aberta'].notna().any() else 0
+    valores = horas * 60 + minutos
+    tem_segundos = ~np.isnan(segundos)
+    valores[tem_segundos] = valores[tem_segundos] + segundos[tem_segundos] / 60
     
-    total_cursos = df['Curso'].nunique()
-    total_diretores = df['Diretor'].nunique()
+    # Valores fora do padrão (vazios, malformados) usam o conversor original
+    fora_do_padrao = np.isnan(horas)
+    if fora_do_padrao.any():
+        valores[fora_do_padrao] = [convert_time_to_minutes(v) for v in np.asarray(uniques, dtype=object)[fora_do_padrao]]
     
-    return {
-        'total_participantes': total_participantes,
-        'total_presentes': total_presentes,
-        'taxa_presenca': taxa_presenca,
-        'media_participacao': media_participacao,
-        'total_pesquisas': total_pesquisas,
-        'taxa_pesquisa': taxa_pesquisa,
-        'media_camera': media_camera,
-        'total_cursos': total_cursos,
-        'total_diretores': total_diretores
-    }
+    resultado = np.where(codes >= 0, valores[codes], 0.0)
+    return pd.Series(resultado, index=series.index)
+
+def get_summary_metrics(df):
+    """Calcula métricas gerais de resumo"""
+    return aggregate_metrics(df, ['summary'])['summary']
 
 def get_metrics_by_director(df):
     """Calcula métricas agrupadas por diretor"""
-    metrics = df.groupby('Diretor').agg({
-        'Presente': ['sum', 'count'],
-        'Participação_minutos': 'sum',
-        'Duração_minutos': 'sum',
-        'Respondeu_Pesquisa': 'sum',
-        '% Câmera aberta': 'mean'
-    }).reset_index()
-    
-    metrics.columns = ['Diretor', 'Presentes', 'Total', 'Participacao_Total_Min', 'Duracao_Total_Min', 'Pesquisas_Respondidas', 'Media_Camera']
-    metrics['Taxa_Presenca'] = (metrics['Presentes'] / metrics['Total'] * 100).round(2)
+    return aggregate_metrics(df, ['by_director'])['by_director']
+
+def get_metrics_by_course(df):
+    """Calcula métricas agrupadas por curso"""
+    return aggregate_metrics(df, ['by_course'])['by_course']
+
+def get_individual_metrics(df):
+    """Calcula métricas por participante individual"""
+    return aggregate_metrics(df, ['individual'])['individual']
+
+def get_time_series_metrics(df):
+    """Calcula métricas ao longo do tempo"""
+    return aggregate_metrics(df, ['time_series'])['time_series']
+
+def get_session_metrics(df):
+    """Calcula métricas por sessão de treinamento (um curso em uma data)"""
+    return aggregate_metrics(df, ['sessions'])['sessions']
+
+# Visões calculadas por aggregate_metrics
+METRIC_VIEWS = ['summary', 'by_director', 'by_course', 'individual', 'time_series', 'sessions']
+
+# Chave de uma sessão de treinamento
+SESSION_KEY = ['Data', 'Curso']
+
+def _group_codes(series):
+    """Retorna os códigos inteiros (-1 para nulos) e os rótulos de cada grupo"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.intp), pd.Index(series.cat.categories)
+    codes, labels = pd.factorize(series, sort=True)
+    return codes, pd.Index(labels)
+
+def _count_groups(series):
+    """Número de valores distintos não nulos (equivalente a nunique)"""
+    codes, labels = _group_codes(series)
+    return int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=len(labels))))
+
+def _first_by_group(codes, n_groups, values):
+    """Primeiro valor não nulo de values em cada grupo, na ordem das linhas"""
+    validos = np.flatnonzero((codes >= 0) & values.notna().to_numpy())
+    # duplicated() usa tabela hash: evita a ordenação de np.unique
+    primeiros = validos[~pd.Series(codes[validos]).duplicated().to_numpy()]
+    resultado = np.full(n_groups, np.nan, dtype=object)
+    resultado[codes[primeiros]] = values.iloc[primeiros].to_numpy(dtype=object)
+    return resultado
+
+class _Measures:
+    """Medidas por linha extraídas uma única vez e reaproveitadas por todas as visões"""
+    
+    # Extrator de cada medida: coluna de origem convertida para o array somado
+    _EXTRACTORS = {
+        'Presentes': lambda df: df['Presente'].to_numpy(dtype=np.int64),
+        'Participacao_Total_Min': lambda df: df['Participação_minutos'].to_numpy(dtype=np.float64),
+        'Duracao_Total_Min': lambda df: df['Duração_minutos'].to_numpy(dtype=np.float64),
+        'Pesquisas_Respondidas': lambda df: df['Respondeu_Pesquisa'].to_numpy(dtype=np.int64),
+        'Camera_Soma': lambda df: df['% Câmera aberta'].fillna(0).to_numpy(dtype=np.float64),
+        'Camera_Contagem': lambda df: df['% Câmera aberta'].notna().to_numpy(dtype=np.int64),
+        'Participacao_Soma': lambda df: df['% Participação'].fillna(0).to_numpy(dtype=np.float64),
+        'Participacao_Contagem': lambda df: df['% Participação'].notna().to_numpy(dtype=np.int64)
+    }
+    
+    def __init__(self, df):
+        self.df = df
+        self.n = len(df)
+        self._cache = {}
+    
+    def get(self, name):
+        """Array da medida name; nomes desconhecidos levantam KeyError"""
+        if name not in self._cache:
+            if name not in self._EXTRACTORS:
+                raise KeyError(f"Medida desconhecida: {name}")
+            self._cache[name] = self._EXTRACTORS[name](self.df)
+        return self._cache[name]
+    
+    def partials(self, codes, labels, names):
+        """Somas parciais das medidas por grupo (equivalente a groupby().sum())"""
+        partes = _sum_by_codes(codes, labels, {name: self.get(name) for name in names})
+        partes['Total'] = np.bincount(codes + 1, minlength=len(labels) + 1)[1:]
+        return partes[['Presentes', 'Total'] + [nm for nm in names if nm != 'Presentes']]
+
+def _sum_by_codes(codes, labels, values):
+    """Soma cada array de values por grupo; inteiros continuam inteiros"""
+    # Códigos deslocados em 1: linhas sem grupo (-1) caem no bin 0, descartado
+    c = codes + 1
+    n = len(labels) + 1
+    partes = {}
+    for name, valor in values.items():
+        soma = np.bincount(c, weights=valor, minlength=n)[1:]
+        partes[name] = soma.round().astype(np.int64) if valor.dtype == np.int64 else soma
+    return pd.DataFrame(partes, index=labels)
+
+_SUM_MEASURES = ['Presentes', 'Participacao_Total_Min', 'Duracao_Total_Min', 'Pesquisas_Respondidas',
+                 'Camera_Soma', 'Camera_Contagem']
+
+def aggregate_metrics(df, views=None):
+    """Calcula várias visões de métricas com uma única extração das medidas
+    
+    As medidas (presença, minutos, pesquisas, câmera) são lidas uma vez e cada
+    dimensão é agregada com somas parciais aditivas (np.bincount sobre os
+    códigos do grupo). Taxas e médias são derivadas dessas somas, sem novo
+    agrupamento. Retorna um dicionário com as visões pedidas entre
+    METRIC_VIEWS, nos formatos de get_summary_metrics, get_metrics_by_*,
+    get_individual_metrics e get_time_series_metrics.
+    """
+    views = METRIC_VIEWS if views is None else views
+    medidas = _Measures(df)
+    resultado = {}
+    
+    if 'summary' in views:
+        totais = pd.Series({'Total': medidas.n})
+        for name in _SUM_MEASURES:
+            totais[name] = medidas.get(name).sum()
+        resultado['summary'] = summary_from_totals(totais, _count_groups(df['Curso']), _count_groups(df['Diretor']))
+    
+    for view, key in (('by_director', 'Diretor'), ('by_course', 'Curso')):
+        if view in views:
+            codes, labels = _group_codes(df[key])
+            partes = medidas.partials(codes, labels.rename(key), _SUM_MEASURES)
+            resultado[view] = metrics_from_partials(partes[partes['Total'] > 0])
+    
+    if 'time_series' in views or 'sessions' in views:
+        codes, index = _session_codes(df)
+        resultado.update(_session_views(medidas.partials(codes, index, _SUM_MEASURES), views))
+    
+    if 'individual' in views:
+        resultado['individual'] = _individual_from_measures(df, medidas)
+    
+    return resultado
+
+def _time_series_from_partials(partes, cursos, sessoes):
+    """Série temporal a partir das somas por data, do primeiro curso e do número de sessões de cada data"""
+    manter = (partes['Total'] > 0).to_numpy()
+    time_series = metrics_from_partials(partes[manter], round_camera=False)
+    time_series.insert(7, 'Curso', cursos[manter])
+    time_series.insert(8, 'Sessoes', sessoes[manter])
+    return time_series
+
+def _session_codes(df):
+    """Código da sessão (Data, Curso) de cada linha e o índice das sessões
+    
+    As sessões ficam na ordem da primeira linha de cada uma; linhas sem data
+    ficam fora (código -1) e linhas sem curso formam uma sessão com Curso nulo
+    por data, para que a série temporal continue somando todas as linhas.
+    """
+    codes_data, datas = _group_codes(df['Data'])
+    codes_curso, cursos = _group_codes(df['Curso'])
+    validos = np.flatnonzero(codes_data >= 0)
+    chave = codes_data[validos].astype(np.int64) * (len(cursos) + 1) + (codes_curso[validos] + 1)
+    codes = np.full(len(df), -1, dtype=np.intp)
+    codes[validos], unicos = pd.factorize(chave)
+    # Código 0 do curso é o nulo
+    rotulos_cursos = np.concatenate([[np.nan], cursos.to_numpy(dtype=object)])
+    index = pd.MultiIndex.from_arrays([datas.take(unicos // (len(cursos) + 1)),
+                                       rotulos_cursos[unicos % (len(cursos) + 1)]], names=SESSION_KEY)
+    return codes, index
+
+def _session_views(partes, views):
+    """Visões 'sessions' e 'time_series' a partir das somas por sessão
+    
+    A série temporal soma as sessões de cada data, sem voltar às linhas; o
+    Curso exibido continua sendo o da primeira sessão da data e Sessoes
+    conta os cursos distintos do dia.
+    """
+    resultado = {}
+    cursos = pd.Series(partes.index.get_level_values('Curso'))
+    if 'time_series' in views:
+        codes, labels = _group_codes(pd.Series(partes.index.get_level_values('Data')))
+        por_data = _sum_by_codes(codes, labels.rename('Data'), {name: partes[name].to_numpy() for name in partes.columns})
+        sessoes = np.bincount(codes[cursos.notna().to_numpy()], minlength=len(labels))
+        resultado['time_series'] = _time_series_from_partials(por_data, _first_by_group(codes, len(labels), cursos), sessoes)
+    if 'sessions' in views:
+        sessoes = partes[cursos.notna().to_numpy() & (partes['Total'] > 0).to_numpy()]
+        resultado['sessions'] = metrics_from_partials(sessoes).sort_values(SESSION_KEY, kind='stable', ignore_index=True)
+    return resultado
+
+def _individual_from_measures(df, medidas):
+    """Métricas por participante a partir das somas parciais"""
+    codes, labels = _group_codes(df['Participante'])
+    partes = medidas.partials(codes, labels, ['Presentes', 'Participacao_Soma', 'Participacao_Contagem',
+                                              'Pesquisas_Respondidas', 'Camera_Soma', 'Camera_Contagem'])
+    
+    # Cursos diferentes: pares (participante, curso) distintos por participante
+    cursos, rotulos_cursos = _group_codes(df['Curso'])
+    validos = (codes >= 0) & (cursos >= 0)
+    pares = pd.unique(codes[validos].astype(np.int64) * max(len(rotulos_cursos), 1) + cursos[validos])
+    cursos_diferentes = np.bincount(pares // max(len(rotulos_cursos), 1), minlength=len(labels))
+    
+    metrics = pd.DataFrame({
+        'Participante': labels,
+        'Presentes': partes['Presentes'].to_numpy(),
+        'Total_Convites': partes['Total'].to_numpy(),
+        'Media_Participacao': (partes['Participacao_Soma'] / partes['Participacao_Contagem'].where(partes['Participacao_Contagem'] > 0)).to_numpy(),
+        'Pesquisas_Respondidas': partes['Pesquisas_Respondidas'].to_numpy(),
+        'Media_Camera': (partes['Camera_Soma'] / partes['Camera_Contagem'].where(partes['Camera_Contagem'] > 0)).to_numpy(),
+        'Cursos_Diferentes': cursos_diferentes,
+        'Diretor': _first_by_group(codes, len(labels), df['Diretor'])
+    })
+    metrics = metrics[metrics['Total_Convites'] > 0].reset_index(drop=True)
+    
+    metrics['Taxa_Presenca'] = (metrics['Presentes'] / metrics['Total_Convites'] * 100).round(2)
     metrics['Taxa_Pesquisa'] = (metrics['Pesquisas_Respondidas'] / metrics['Presentes'].replace(0, 1) * 100).round(2)
     metrics.loc[metrics['Presentes'] == 0, 'Taxa_Pesquisa'] = 0
-    # Média de participação = soma de participação / soma de duração * 100
-    metrics['Media_Participacao'] = (metrics['Participacao_Total_Min'] / metrics['Duracao_Total_Min'].replace(0, 1) * 100).round(2)
-    metrics.loc[metrics['Duracao_Total_Min'] == 0, 'Media_Participacao'] = 0
+    metrics['Media_Participacao'] = metrics['Media_Participacao'].round(2)
     metrics['Media_Camera'] = metrics['Media_Camera'].round(2)
     
     return metrics
 
-def get_metrics_by_course(df):
-    """Calcula métricas agrupadas por curso"""
-    metrics = df.groupby('Curso').agg({
-        'Presente': ['sum', 'count'],
-        'Participação_minutos': 'sum',
-        'Duração_minutos': 'sum',
-        'Respondeu_Pesquisa': 'sum',
-        '% Câmera aberta': 'mean'
-    }).reset_index()
-    
-    metrics.columns = ['Curso', 'Presentes', 'Total', 'Participacao_Total_Min', 'Duracao_Total_Min', 'Pesquisas_Respondidas', 'Media_Camera']
+def distribution(values, bins=20, value_range=None, label_format='{:.0f}-{:.0f}%', weights=None):
+    """Distribuição de values em bins intervalos de mesma largura, em uma única passada
+    
+    Os intervalos vão do mínimo ao máximo dos valores (ou de value_range) e
+    são fechados à esquerda; o último também inclui o limite superior. Nulos
+    são ignorados. Retorna um DataFrame com Inicio, Fim, Contagem e Faixa
+    (rótulo formatado com label_format) para cada intervalo, inclusive os
+    vazios. Serve para % Participação, % Câmera aberta ou minutos. weights
+    dá o peso de cada valor (por exemplo, os itens de um QuantileSketch).
+    """
+    valores = pd.Series(values)
+    pesos = None if weights is None else np.asarray(weights, dtype=np.float64)[valores.notna().to_numpy()]
+    valores = valores.dropna().to_numpy()
+    colunas = ['Inicio', 'Fim', 'Contagem', 'Faixa']
+    if len(valores) == 0:
+        return pd.DataFrame(columns=colunas)
+    
+    if not np.issubdtype(valores.dtype, np.floating):
+        valores = valores.astype(np.float64)
+    minimo, maximo = value_range if value_range is not None else (valores.min(), valores.max())
+    minimo, maximo = valores.dtype.type(minimo), valores.dtype.type(maximo)
+    largura = (maximo - minimo) / bins
+    limites = minimo + np.arange(bins + 1, dtype=valores.dtype) * largura
+    
+    # Busca binária sobre os valores ordenados: intervalos [início, fim), o último fechado
+    ordem = np.argsort(valores, kind='stable') if pesos is not None else None
+    ordenados = valores[ordem] if pesos is not None else np.sort(valores)
+    acumulado = np.searchsorted(ordenados, limites[:-1], side='left')
+    fim = np.searchsorted(ordenados, limites[-1], side='right')
+    posicoes = np.append(acumulado, fim)
+    if pesos is not None:
+        # Soma dos pesos por intervalo: diferença do peso acumulado nas posições
+        peso_acumulado = np.concatenate([[0.0], np.cumsum(pesos[ordem])])
+        contagens = np.diff(peso_acumulado[posicoes])
+    else:
+        contagens = np.diff(posicoes)
+    
+    return pd.DataFrame({
+        'Inicio': limites[:-1],
+        'Fim': limites[1:],
+        'Contagem': contagens,
+        'Faixa': [label_format.format(a, b) for a, b in zip(limites[:-1], limites[1:])]
+    })
+
+def _top_positions(values, n, largest=True):
+    """Posições dos n maiores (ou menores) valores, com empates pela ordem das linhas
+    
+    Nulos só entram no fim, quando há menos de n valores, como em nlargest.
+    """
+    nulos = np.isnan(values)
+    posicoes = np.flatnonzero(~nulos)
+    chave = values[posicoes] if not largest else -values[posicoes]
+    if len(chave) > n:
+        # Seleção parcial: só os candidatos até o n-ésimo valor (com empates) são ordenados
+        limite = np.partition(chave, n - 1)[n - 1]
+        candidatos = chave <= limite
+        posicoes, chave = posicoes[candidatos], chave[candidatos]
+    ordenadas = posicoes[np.lexsort((posicoes, chave))][:n]
+    if len(ordenadas) < n:
+        ordenadas = np.concatenate([ordenadas, np.flatnonzero(nulos)[:n - len(ordenadas)]])
+    return ordenadas
+
+def top_n(df, columns, n=10, largest=True):
+    """Os n maiores (ou menores) registros de df para cada coluna de columns
+    
+    Usa seleção parcial (np.partition) em vez de ordenar o DataFrame
+    inteiro; empates mantêm a ordem das linhas e nulos ficam por último,
+    como em DataFrame.nlargest/nsmallest. Retorna um dicionário coluna ->
+    DataFrame já ordenado.
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+    return {col: df.iloc[_top_positions(df[col].to_numpy(dtype=np.float64, na_value=np.nan), n, largest)]
+            for col in columns}
+
+def color_bins(values, bins=20):
+    """Faixa de cor (0 a bins - 1) de cada valor na escala do mínimo ao máximo
+    
+    É a normalização do Styler.background_gradient (por coluna) arredondada
+    para bins níveis, calculada uma vez para a tabela inteira. Nulos recebem -1.
+    """
+    valores = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    resultado = np.full(len(valores), -1, dtype=np.int64)
+    validos = ~np.isnan(valores)
+    if not validos.any():
+        return resultado
+    minimo, maximo = valores[validos].min(), valores[validos].max()
+    escala = (valores[validos] - minimo) / (maximo - minimo) if maximo > minimo else np.zeros(validos.sum())
+    resultado[validos] = np.rint(escala * (bins - 1)).astype(np.int64)
+    return resultado
+
+def lttb(x, y, n_out):
+    """Posições dos pontos mantidos pelo Largest-Triangle-Three-Buckets (LTTB)
+    
+    Reduz a série (x crescente, por exemplo datas) a n_out pontos preservando
+    o formato da curva: o primeiro e o último ponto ficam e, em cada um dos
+    n_out - 2 intervalos do meio, fica o ponto que forma o maior triângulo
+    com o ponto escolhido no intervalo anterior e a média do seguinte. Séries
+    com até n_out pontos voltam inteiras. Retorna as posições em ordem crescente.
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype(np.int64)
+    x = x.astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    limites = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    escolhidos = np.empty(n_out, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Terceiro vértice: média do próximo intervalo (no último, o ponto final)
+        seguinte = slice(fim, limites[i + 2]) if i + 2 < len(limites) else slice(n - 1, n)
+        mx, my = x[seguinte].mean(), y[seguinte].mean()
+        area = np.abs((x[a] - mx) * (y[inicio:fim] - y[a]) - (x[a] - x[inicio:fim]) * (my - y[a]))
+        a = inicio + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        escolhidos[i + 1] = a
+    return escolhidos
+
+def downsample(df, x, y, max_points):
+    """Linhas de df reduzidas a max_points pontos da curva (x, y) por LTTB"""
+    return df.iloc[lttb(df[x], df[y], max_points)]
+
+# Filtros categóricos da sidebar: argumento dos filtros -> coluna filtrada
+FILTER_COLUMNS = {'cursos': 'Curso', 'diretores': 'Diretor', 'status': 'Status'}
+
+def _filter_conditions(cursos=None, diretores=None, status=None, exclude=None):
+    """Lista de (coluna, valores, incluir) dos filtros categóricos informados"""
+    condicoes = []
+    for arg, valores in (('cursos', cursos), ('diretores', diretores), ('status', status)):
+        if valores is not None:
+            condicoes.append((FILTER_COLUMNS[arg], [valores] if isinstance(valores, str) else list(valores), True))
+    for arg, valores in (exclude or {}).items():
+        if valores:
+            condicoes.append((FILTER_COLUMNS[arg], [valores] if isinstance(valores, str) else list(valores), False))
+    return condicoes
+
+def filter_mask(df, date_range=None, cursos=None, diretores=None, status=None, exclude=None):
+    """Máscara booleana dos filtros da sidebar
+    
+    date_range é um par (início, fim) inclusivo; cursos, diretores e status
+    aceitam um valor ou uma lista, como em load_data_sqlite. exclude remove
+    valores, com as mesmas chaves: por exemplo {'cursos': ['Curso A']}.
+    """
+    mascara = np.ones(len(df), dtype=bool)
+    if date_range is not None:
+        inicio, fim = date_range
+        mascara &= ((df['Data'] >= pd.Timestamp(inicio)) & (df['Data'] <= pd.Timestamp(fim))).to_numpy()
+    for col, valores, incluir in _filter_conditions(cursos, diretores, status, exclude):
+        selecionados = df[col].isin(valores).to_numpy()
+        mascara &= selecionados if incluir else ~selecionados
+    return mascara
+
+class FilterIndex:
+    """Índice dos filtros da sidebar, construído uma vez por versão da base
+    
+    Curso, Diretor e Status guardam um bitmap de linhas por valor
+    (empacotado, n/8 bytes por valor); as datas ficam ordenadas e um período
+    é resolvido por busca binária. select() combina os bitmaps (inclusões com
+    AND, exclusões com AND NOT) sem tocar nos valores das linhas e tem a
+    mesma semântica de filter_mask.
+    """
+    
+    # Número de bitmaps acumulados do índice de datas (memória: n/8 bytes cada)
+    DATE_CHECKPOINTS = 64
+    
+    def __init__(self, df):
+        self.n = len(df)
+        self._labels = {}
+        self._bitmaps = {}
+        for col in FILTER_COLUMNS.values():
+            codes, labels = _group_codes(df[col])
+            self._labels[col] = labels
+            bitmaps = np.zeros((len(labels), (self.n + 7) // 8), dtype=np.uint8)
+            for i in range(len(labels)):
+                bitmaps[i] = np.packbits(codes == i)
+            self._bitmaps[col] = bitmaps
+        
+        datas = df['Data'].to_numpy(dtype='datetime64[ns]')
+        validas = ~np.isnat(datas)
+        self._ordem = np.flatnonzero(validas)[np.argsort(datas[validas], kind='stable')]
+        self._datas = datas[self._ordem]
+        
+        # Bitmaps acumulados a cada passo da ordem por data: um período vira a
+        # diferença de dois deles mais as bordas, marcadas linha a linha
+        self._passo = max(len(self._ordem) // self.DATE_CHECKPOINTS, 1)
+        marcas = range(0, len(self._ordem) + 1, self._passo)
+        self._acumulados = np.zeros((len(marcas), (self.n + 7) // 8), dtype=np.uint8)
+        mascara = np.zeros(self.n, dtype=bool)
+        for i, fim in enumerate(marcas):
+            mascara[self._ordem[max(fim - self._passo, 0):fim]] = True
+            self._acumulados[i] = np.packbits(mascara)
+        self._datas_validas = np.packbits(validas)
+    
+    def _bitmap_valores(self, col, valores):
+        codigos = self._labels[col].get_indexer(valores)
+        codigos = codigos[codigos >= 0]
+        if len(codigos) == 0:
+            return np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce(self._bitmaps[col][codigos], axis=0)
+    
+    def _bitmap_periodo(self, date_range):
+        inicio, fim = (np.datetime64(pd.Timestamp(d), 'ns') for d in date_range)
+        lo = np.searchsorted(self._datas, inicio, side='left')
+        hi = np.searchsorted(self._datas, fim, side='right')
+        if lo == 0 and hi == len(self._datas):
+            return self._datas_validas
+        
+        k_inicio = -(-lo // self._passo)
+        k_fim = min(hi // self._passo, len(self._acumulados) - 1)
+        mascara = np.zeros(self.n, dtype=bool)
+        if k_inicio >= k_fim:
+            mascara[self._ordem[lo:hi]] = True
+            return np.packbits(mascara)
+        mascara[self._ordem[lo:k_inicio * self._passo]] = True
+        mascara[self._ordem[k_fim * self._passo:hi]] = True
+        return (self._acumulados[k_fim] & ~self._acumulados[k_inicio]) | np.packbits(mascara)
+    
+    def select(self, date_range=None, cursos=None, diretores=None, status=None, exclude=None):
+        """Máscara booleana das linhas que atendem aos filtros"""
+        bits = None
+        for col, valores, incluir in _filter_conditions(cursos, diretores, status, exclude):
+            bitmap = self._bitmap_valores(col, valores)
+            if not incluir:
+                bitmap = ~bitmap
+            bits = bitmap if bits is None else bits & bitmap
+        if date_range is not None:
+            bitmap = self._bitmap_periodo(date_range)
+            bits = bitmap if bits is None else bits & bitmap
+        if bits is None:
+            return np.ones(self.n, dtype=bool)
+        return np.unpackbits(bits, count=self.n).view(bool)
+
+# Colunas com índice de linhas para os detalhamentos (drill-down)
+GROUP_INDEX_COLUMNS = ['Participante', 'Diretor']
+
+class GroupIndex:
+    """Posições das linhas de cada participante e de cada diretor
+    
+    Construído uma vez por versão da base. As posições de cada valor ficam
+    contíguas (ordenação estável pelos códigos), então rows() custa o
+    tamanho do histórico do valor, não o tamanho da base.
+    """
+    
+    def __init__(self, df, columns=GROUP_INDEX_COLUMNS):
+        self._grupos = {}
+        for col in columns:
+            codes, labels = _group_codes(df[col])
+            # Códigos deslocados em 1: linhas sem valor (-1) ficam no início
+            ordem = np.argsort(codes + 1, kind='stable')
+            inicios = np.concatenate([[0], np.cumsum(np.bincount(codes + 1, minlength=len(labels) + 1))])
+            self._grupos[col] = (labels, ordem, inicios)
+    
+    def rows(self, col, value):
+        """Posições (crescentes) das linhas em que col == value"""
+        labels, ordem, inicios = self._grupos[col]
+        codigo = labels.get_indexer([value])[0]
+        if codigo < 0:
+            return np.array([], dtype=ordem.dtype)
+        return ordem[inicios[codigo + 1]:inicios[codigo + 2]]
+
+def normalize_name(text):
+    """Nome em minúsculas, sem acentos e com espaços simples, para buscas"""
+    sem_acentos = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.casefold().split())
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class NameSearchIndex:
+    """Busca de nomes por trechos e por trigramas, sem acentos e sem caixa
+    
+    Cada trigrama dos nomes normalizados guarda a lista dos nomes em que
+    aparece. Uma busca com 3 ou mais caracteres só confere o trecho nos
+    nomes da lista do seu trigrama mais raro; buscas de 1 ou 2 caracteres
+    percorrem todos os nomes. matches() devolve os nomes que
+    contêm a busca; search() ordena os resultados: primeiro os que têm a
+    busca no início do nome ou de uma palavra ("silva" em "Maria da Silva"),
+    depois os demais trechos, ambos em ordem alfabética, e por fim os nomes
+    parecidos pelos trigramas (erros de digitação).
+    """
+    
+    # Fração mínima dos trigramas da busca presentes no nome
+    MIN_TRIGRAM_SCORE = 0.5
+    
+    def __init__(self, names):
+        self.names = np.array(sorted({str(n) for n in names if pd.notna(n)}), dtype=object)
+        self._normalizados = np.array([normalize_name(n) for n in self.names], dtype=object)
+        
+        postings = {}
+        for i, nome in enumerate(self._normalizados):
+            for tri in _trigrams(nome):
+                postings.setdefault(tri, []).append(i)
+        self._trigramas = {tri: np.array(ids, dtype=np.int64) for tri, ids in postings.items()}
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def _substring_ids(self, consulta):
+        """Ids (em ordem alfabética) dos nomes que contêm a consulta normalizada"""
+        tris = _trigrams(consulta)
+        if not tris:
+            candidatos = np.arange(len(self.names))
+        else:
+            # Candidatos: os nomes do trigrama mais raro da consulta
+            candidatos = min((self._trigramas.get(t, np.empty(0, dtype=np.int64)) for t in tris), key=len)
+            if len(tris) == 1:
+                return candidatos
+        contem = np.fromiter((consulta in nome for nome in self._normalizados[candidatos]), dtype=bool,
+                             count=len(candidatos))
+        return candidatos[contem]
+    
+    def _trigram_scores(self, consulta):
+        tris = [self._trigramas[t] for t in _trigrams(consulta) if t in self._trigramas]
+        total = len(_trigrams(consulta))
+        if total == 0 or not tris:
+            return np.array([], dtype=np.int64), np.array([])
+        contagem = np.bincount(np.concatenate(tris), minlength=len(self.names))
+        ids = np.flatnonzero(contagem >= self.MIN_TRIGRAM_SCORE * total)
+        return ids, contagem[ids] / total
+    
+    def matches(self, query):
+        """Nomes que contêm a busca (sem acentos e sem caixa), em ordem alfabética"""
+        consulta = normalize_name(query)
+        if not consulta:
+            return self.names.tolist()
+        return self.names[self._substring_ids(consulta)].tolist()
+    
+    def search(self, query, limit=20, among=None):
+        """Nomes que correspondem à busca, dos melhores para os piores
+        
+        Busca vazia devolve os nomes em ordem alfabética. among restringe o
+        resultado a um conjunto de nomes (por exemplo, os do filtro atual);
+        limit=None devolve todos.
+        """
+        consulta = normalize_name(query)
+        permitidos = None if among is None else np.isin(self.names, np.asarray(list(among), dtype=object))
+        
+        if not consulta:
+            ids = np.arange(len(self.names))
+        else:
+            trechos = self._substring_ids(consulta)
+            # Início do nome ou de uma palavra antes dos trechos no meio das palavras
+            inicio = np.fromiter((nome.startswith(consulta) or f' {consulta}' in nome
+                                  for nome in self._normalizados[trechos]), dtype=bool, count=len(trechos))
+            ids = np.concatenate([trechos[inicio], trechos[~inicio]])
+            visiveis = len(ids) if permitidos is None else int(permitidos[ids].sum())
+            # Os parecidos só entram depois dos trechos: dispensáveis se o limite já foi atingido
+            if limit is None or visiveis < limit:
+                ids_tri, notas = self._trigram_scores(consulta)
+                # Maior semelhança primeiro; empates em ordem alfabética (ids já são alfabéticos)
+                ids_tri = ids_tri[np.lexsort((ids_tri, -notas))]
+                ids = np.concatenate([ids, ids_tri[~np.isin(ids_tri, ids)]]).astype(np.int64)
+        
+        if permitidos is not None:
+            ids = ids[permitidos[ids]]
+        if limit is not None:
+            ids = ids[:limit]
+        return self.names[ids].tolist()
+
+# Dimensões do cubo de métricas: as mesmas dos filtros da sidebar
+CUBE_DIMENSIONS = ['Data'] + list(FILTER_COLUMNS.values())
+
+class MetricsCube:
+    """Somas parciais pré-agregadas por (Data, Curso, Diretor, Status)
+    
+    Construído uma vez por versão da base. O resumo, as visões por diretor e
+    por curso, a série temporal e as sessões são respondidos a partir das
+    células, então o custo de um filtro da sidebar depende do número de
+    células, não de linhas. As células ficam na ordem da primeira linha de
+    cada combinação, o que preserva o "primeiro curso" de cada data da série
+    temporal.
+    """
+    
+    def __init__(self, cells):
+        self.cells = cells
+    
+    @classmethod
+    def from_frame(cls, df):
+        """Constrói o cubo a partir das linhas processadas (ver CUBE_COLUMNS)"""
+        medidas = _Measures(df)
+        # Chave combinada das dimensões, com nulos (-1) no código 0
+        chave = np.zeros(len(df), dtype=np.int64)
+        for col in CUBE_DIMENSIONS:
+            codes, labels = _group_codes(df[col])
+            chave = chave * (len(labels) + 1) + (codes + 1)
+        celulas, unicos = pd.factorize(chave)
+        primeiras = np.flatnonzero(~pd.Series(celulas).duplicated().to_numpy())
+        
+        partes = medidas.partials(celulas, pd.RangeIndex(len(unicos)), _SUM_MEASURES)
+        cells = pd.DataFrame({col: df[col].iloc[primeiras].reset_index(drop=True) for col in CUBE_DIMENSIONS})
+        for name in partes.columns:
+            cells[name] = partes[name].to_numpy()
+        return cls(cells)
+    
+    def __len__(self):
+        return len(self.cells)
+    
+    def options(self, col, **filters):
+        """Valores distintos e ordenados de uma dimensão nas células filtradas
+        
+        filters aceita os mesmos argumentos de filter_mask.
+        """
+        valores = self.cells.loc[filter_mask(self.cells, **filters), col]
+        return sorted(valores.dropna().unique().tolist())
+    
+    def aggregate(self, views=None, **filters):
+        """Visões de métricas das células filtradas, no formato de aggregate_metrics
+        
+        Aceita as visões de METRIC_VIEWS exceto 'individual', que depende dos
+        participantes e continua sendo calculada sobre as linhas. filters
+        aceita os mesmos argumentos de filter_mask.
+        """
+        views = [v for v in METRIC_VIEWS if v != 'individual'] if views is None else views
+        if 'individual' in views:
+            raise ValueError("A visão 'individual' não pode ser calculada a partir do cubo")
+        cells = self.cells[filter_mask(self.cells, **filters)]
+        somas = ['Presentes', 'Total'] + _SUM_MEASURES[1:]
+        resultado = {}
+        
+        if 'summary' in views:
+            totais = cells[somas].sum()
+            resultado['summary'] = summary_from_totals(totais, _count_groups(cells['Curso']), _count_groups(cells['Diretor']))
+        
+        for view, key in (('by_director', 'Diretor'), ('by_course', 'Curso')):
+            if view in views:
+                codes, labels = _group_codes(cells[key])
+                partes = _sum_by_codes(codes, labels.rename(key), {name: cells[name].to_numpy() for name in somas})
+                resultado[view] = metrics_from_partials(partes[partes['Total'] > 0])
+        
+        if 'time_series' in views or 'sessions' in views:
+            codes, index = _session_codes(cells)
+            partes = _sum_by_codes(codes, index, {name: cells[name].to_numpy() for name in somas})
+            resultado.update(_session_views(partes, views))
+        
+        return resultado
+
+class MetricsMemo:
+    """Cache LRU com expiração (TTL) para resultados de métricas
+    
+    As chaves devem identificar a versão da base e os filtros aplicados, por
+    exemplo (LazyDataset.version, 'by_director', filtros). Guarda no máximo
+    maxsize resultados; o menos usado recentemente é descartado primeiro e
+    entradas com mais de ttl segundos são recalculadas. Seguro para uso
+    concorrente por várias sessões.
+    """
+    
+    def __init__(self, maxsize=128, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def get_or_compute(self, key, func):
+        """Retorna o resultado guardado para key, ou calcula func() e guarda"""
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is not None and agora - entrada[0] <= self.ttl:
+                self._entradas.move_to_end(key)
+                self.hits += 1
+                return entrada[1]
+            self.misses += 1
+        
+        # Cálculo fora do lock: sessões com chaves diferentes não se bloqueiam
+        valor = func()
+        with self._lock:
+            self._entradas[key] = (time.monotonic(), valor)
+            self._entradas.move_to_end(key)
+            while len(self._entradas) > self.maxsize:
+                self._entradas.popitem(last=False)
+                self.evictions += 1
+        return valor
+    
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+    
+    def stats(self):
+        """Contadores de acertos, faltas e descartes do cache"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entradas), 'maxsize': self.maxsize}
+
+def filter_key(date_range=None, cursos=None, diretores=None, status=None, exclude=None):
+    """Chave estável e hashable para uma combinação de filtros da sidebar
+    
+    Seleções com os mesmos valores em outra ordem geram a mesma chave.
+    """
+    periodo = None if date_range is None else tuple(pd.Timestamp(d) for d in date_range)
+    condicoes = _filter_conditions(cursos, diretores, status, exclude)
+    return (periodo,) + tuple(sorted((col, tuple(sorted(set(valores))), incluir)
+                                     for col, valores, incluir in condicoes))
+
+def frame_fingerprint(data):
+    """Hash do conteúdo de um DataFrame ou Series (colunas, tipos, índice e valores)
+    
+    Serve de chave de cache para resultados derivados de um agregado, como
+    as figuras do dashboard: conteúdos iguais geram o mesmo hash.
+    """
+    h = hashlib.sha256()
+    colunas = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+    tipos = data.dtypes if isinstance(data, pd.DataFrame) else [data.dtype]
+    h.update(repr((list(colunas), [str(t) for t in tipos])).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+# Colunas processadas lidas por cada função de métricas
+METRIC_COLUMNS = {
+    'get_summary_metrics': ['Presente', 'Participação_minutos', 'Duração_minutos', 'Respondeu_Pesquisa',
+                            '% Câmera aberta', 'Curso', 'Diretor'],
+    'get_metrics_by_director': ['Diretor', 'Presente', 'Participação_minutos', 'Duração_minutos',
+                                'Respondeu_Pesquisa', '% Câmera aberta'],
+    'get_metrics_by_course': ['Curso', 'Presente', 'Participação_minutos', 'Duração_minutos',
+                              'Respondeu_Pesquisa', '% Câmera aberta'],
+    'get_individual_metrics': ['Participante', 'Presente', '% Participação', 'Respondeu_Pesquisa',
+                               '% Câmera aberta', 'Curso', 'Diretor'],
+    'get_time_series_metrics': ['Data', 'Presente', 'Participação_minutos', 'Duração_minutos',
+                                'Respondeu_Pesquisa', '% Câmera aberta', 'Curso'],
+    'get_session_metrics': ['Data', 'Curso', 'Presente', 'Participação_minutos', 'Duração_minutos',
+                            'Respondeu_Pesquisa', '% Câmera aberta']
+}
+
+def columns_for(*names, extra=()):
+    """Une as colunas necessárias às funções de métricas informadas"""
+    colunas = list(extra)
+    for name in names:
+        colunas += METRIC_COLUMNS[name]
+    return list(dict.fromkeys(colunas))
+
+# Colunas processadas necessárias para construir o MetricsCube
+CUBE_COLUMNS = columns_for('get_metrics_by_director', 'get_metrics_by_course', 'get_time_series_metrics',
+                           extra=CUBE_DIMENSIONS)
+
+class LazyDataset:
+    """Base de dados carregada coluna a coluna, sob demanda
+    
+    Cada coluna é lida apenas na primeira vez em que algum consumidor a
+    pede, como uma projeção do cache Parquet. Sem cache válido o CSV é
+    processado uma única vez na abertura e o cache é gravado; se a gravação
+    falhar, a base processada fica inteira em memória.
+    """
+    
+    def __init__(self, csv_path=None):
+        self.csv_path = csv_path if csv_path is not None else find_data_file()
+        self._colunas = {}
+        self._cube = None
+        self._filter_index = None
+        self._group_index = None
+        self._name_index = None
+        self._lock = threading.Lock()
+        self._existe = os.path.exists(self.csv_path)
+        # Versão da base para chaves de cache: tamanho e mtime do CSV na abertura
+        self.version = None
+        if self._existe:
+            stat = os.stat(self.csv_path)
+            self.version = (str(self.csv_path), stat.st_size, stat.st_mtime_ns)
+        self._cache_meta = _valid_cache_meta(self.csv_path) if self._existe else None
+        if self._existe and self._cache_meta is None:
+            self._parse()
+    
+    def __len__(self):
+        if not self._existe:
+            return 0
+        # Presente é a coluna mais barata e todas as métricas a usam
+        return len(self.get(['Presente']))
+    
+    @property
+    def empty(self):
+        return len(self) == 0
+    
+    @property
+    def loaded_columns(self):
+        """Colunas já carregadas em memória"""
+        return list(self._colunas)
+    
+    def cube(self):
+        """MetricsCube da base, construído na primeira chamada"""
+        if self._cube is None:
+            self._cube = MetricsCube.from_frame(self.get(CUBE_COLUMNS))
+        return self._cube
+    
+    def name_index(self):
+        """NameSearchIndex dos participantes, construído na primeira chamada"""
+        if self._name_index is None:
+            self._name_index = NameSearchIndex(self.get(['Participante'])['Participante'].unique())
+        return self._name_index
+    
+    def group_index(self):
+        """GroupIndex da base, construído na primeira chamada"""
+        if self._group_index is None:
+            self._group_index = GroupIndex(self.get(GROUP_INDEX_COLUMNS))
+        return self._group_index
+    
+    def filter_index(self):
+        """FilterIndex da base, construído na primeira chamada"""
+        if self._filter_index is None:
+            self._filter_index = FilterIndex(self.get(CUBE_DIMENSIONS))
+        return self._filter_index
+    
+    def get(self, columns, rows=None):
+        """Retorna um DataFrame só com as colunas pedidas
+        
+        rows (máscara booleana ou posições) restringe as linhas retornadas.
+        """
+        columns = list(columns)
+        faltando = [c for c in columns if c not in self._colunas]
+        if faltando and self._existe:
+            with self._lock:
+                faltando = [c for c in faltando if c not in self._colunas]
+                if faltando:
+                    self._load(faltando)
+        
+        if not self._existe:
+            return pd.DataFrame(columns=columns)
+        
+        if rows is None:
+            return pd.DataFrame({c: self._colunas[c] for c in columns})
+        # Recortar cada coluna antes de montar o DataFrame: custo do recorte, não da base
+        posicoes = np.asarray(rows)
+        if posicoes.dtype == bool:
+            posicoes = np.flatnonzero(posicoes)
+        indice = self._colunas[columns[0]].index.take(posicoes) if columns else None
+        return pd.DataFrame({c: self._colunas[c].array.take(posicoes) for c in columns}, index=indice)
+    
+    def _load(self, columns):
+        if self._cache_meta is not None:
+            try:
+                df = apply_schema(_read_cache_parts(self.csv_path, self._cache_meta, columns))
+                self._colunas.update({c: df[c] for c in columns})
+                return
+            except Exception:
+                # Cache removido ou corrompido entre leituras: voltar ao CSV
+                self._cache_meta = None
+                self._colunas.clear()
+                self._parse(write_cache=False)
+        
+        faltando = [c for c in columns if c not in self._colunas]
+        if faltando:
+            raise KeyError(faltando)
+    
+    def _parse(self, write_cache=True):
+        """Processa o CSV inteiro uma vez e grava o cache Parquet
+        
+        As colunas passam a ser lidas do Parquet; sem cache gravado, a base
+        processada fica em memória.
+        """
+        df = parse_csv(self.csv_path)
+        if write_cache:
+            write_parsed_cache(self.csv_path, df)
+            self._cache_meta = _valid_cache_meta(self.csv_path)
+        if self._cache_meta is None:
+            self._colunas.update({c: df[c] for c in df.columns})
+
+# Colunas brutas necessárias para as métricas agregadas (sem textos livres)
+AGGREGATE_COLUMNS = [
+    'Data', 'Diretor', 'Curso', 'Duração', 'Participação', '% Participação',
+    '% Câmera aberta', 'Respondeu a Pesquisa de Satisfação?', 'Status'
+]
+
+def partial_sums(df, key):
+    """Calcula somas parciais aditivas por chave
+    
+    As somas podem ser acumuladas entre blocos de dados e depois convertidas
+    nas métricas finais por metrics_from_partials.
+    """
+    camera = df['% Câmera aberta']
+    partes = pd.DataFrame({
+        'Presentes': df['Presente'].astype('int64'),
+        'Total': np.ones(len(df), dtype='int64'),
+        'Participacao_Total_Min': df['Participação_minutos'],
+        'Duracao_Total_Min': df['Duração_minutos'],
+        'Pesquisas_Respondidas': df['Respondeu_Pesquisa'].astype('int64'),
+        'Camera_Soma': camera.fillna(0).astype(float),
+        'Camera_Contagem': camera.notna().astype('int64')
+    }, index=df.index)
+    chaves = [df[k] for k in key] if isinstance(key, list) else df[key]
+    return partes.groupby(chaves, observed=True).sum()
+
+def metrics_from_partials(partials, round_camera=True):
+    """Converte somas parciais no formato de get_metrics_by_director/course"""
+    metrics = partials.reset_index()
+    metrics['Media_Camera'] = metrics['Camera_Soma'] / metrics['Camera_Contagem'].where(metrics['Camera_Contagem'] > 0)
+    if round_camera:
+        metrics['Media_Camera'] = metrics['Media_Camera'].round(2)
+    metrics = metrics.drop(columns=['Camera_Soma', 'Camera_Contagem'])
+    
     metrics['Taxa_Presenca'] = (metrics['Presentes'] / metrics['Total'] * 100).round(2)
     metrics['Taxa_Pesquisa'] = (metrics['Pesquisas_Respondidas'] / metrics['Presentes'].replace(0, 1) * 100).round(2)
     metrics.loc[metrics['Presentes'] == 0, 'Taxa_Pesquisa'] = 0
     # Média de participação = soma de participação / soma de duração * 100
     metrics['Media_Participacao'] = (metrics['Participacao_Total_Min'] / metrics['Duracao_Total_Min'].replace(0, 1) * 100).round(2)
     metrics.loc[metrics['Duracao_Total_Min'] == 0, 'Media_Participacao'] = 0
-    metrics['Media_Camera'] = metrics['Media_Camera'].round(2)
     
     return metrics
 
-def get_individual_metrics(df):
-    """Calcula métricas por participante individual"""
-    metrics = df.groupby('Participante').agg({
-        'Presente': ['sum', 'count'],
-        '% Participação': 'mean',
-        'Respondeu_Pesquisa': 'sum',
-        '% Câmera aberta': 'mean',
-        'Curso': 'nunique',
-        'Diretor': 'first'
-    }).reset_index()
-    
-    metrics.columns = ['Participante', 'Presentes', 'Total_Convites', 'Media_Participacao', 
-                      'Pesquisas_Respondidas', 'Media_Camera', 'Cursos_Diferentes', 'Diretor']
-    metrics['Taxa_Presenca'] = (metrics['Presentes'] / metrics['Total_Convites'] * 100).round(2)
-    metrics['Taxa_Pesquisa'] = (metrics['Pesquisas_Respondidas'] / metrics['Presentes'].replace(0, 1) * 100).round(2)
-    metrics.loc[metrics['Presentes'] == 0, 'Taxa_Pesquisa'] = 0
-    metrics['Media_Participacao'] = metrics['Media_Participacao'].round(2)
-    metrics['Media_Camera'] = metrics['Media_Camera'].round(2)
+def summary_from_totals(totais, total_cursos, total_diretores):
+    """Converte as somas totais no dicionário de get_summary_metrics"""
+    total_participantes = int(totais['Total'])
+    total_presentes = int(totais['Presentes'])
+    total_pesquisas = int(totais['Pesquisas_Respondidas'])
+    return {
+        'total_participantes': total_participantes,
+        'total_presentes': total_presentes,
+        'taxa_presenca': (total_presentes / total_participantes * 100) if total_participantes > 0 else 0,
+        'media_participacao': (totais['Participacao_Total_Min'] / totais['Duracao_Total_Min'] * 100) if totais['Duracao_Total_Min'] > 0 else 0,
+        'total_pesquisas': total_pesquisas,
+        'taxa_pesquisa': (total_pesquisas / total_presentes * 100) if total_presentes > 0 else 0,
+        'media_camera': (totais['Camera_Soma'] / totais['Camera_Contagem']) if totais['Camera_Contagem'] > 0 else 0,
+        'total_cursos': int(total_cursos),
+        'total_diretores': int(total_diretores)
+    }
+
+def _add_partials(acumulado, parcial):
+    """Soma duas tabelas de somas parciais alinhando pelas chaves"""
+    if acumulado is None:
+        return parcial
+    # add() com fill_value promove inteiros a float; restaurar os tipos
+    return acumulado.add(parcial, fill_value=0).astype(parcial.dtypes.to_dict())
+
+def _streaming_keep_mask(csv_path, chunksize):
+    """Máscara das linhas mantidas por drop_duplicate_records, lida em blocos
     
-    return metrics
+    Cada chave (Data, Participante, Curso) vira um hash de 64 bits, então
+    a memória é de 9 bytes por linha em vez dos textos da chave.
+    """
+    hashes = []
+    completas = []
+    leitor = pd.read_csv(csv_path, sep=';', encoding='utf-8', usecols=RECORD_KEY, chunksize=chunksize)
+    for chunk in leitor:
+        chunk['Data'] = derive_column(chunk, 'Data')
+        completas.append(complete_key(chunk).to_numpy())
+        hashes.append(pd.util.hash_pandas_object(chunk[RECORD_KEY], index=False).to_numpy())
+    if not hashes:
+        return np.zeros(0, dtype=bool)
+    manter = np.concatenate(completas)
+    hashes = np.concatenate(hashes)
+    
+    # Última ocorrência de cada chave: fim de cada sequência de hashes iguais
+    # na ordenação estável (linhas incompletas têm chave própria e já saem pela máscara)
+    ordem = np.argsort(hashes, kind='stable')
+    hashes = hashes[ordem]
+    fim_sequencia = np.append(hashes[1:] != hashes[:-1], True)
+    ultimas = np.zeros(len(manter), dtype=bool)
+    ultimas[ordem[fim_sequencia]] = True
+    return manter & ultimas
 
-def get_time_series_metrics(df):
-    """Calcula métricas ao longo do tempo"""
-    df_sorted = df.sort_values('Data')
-    time_series = df_sorted.groupby('Data').agg({
-        'Presente': ['sum', 'count'],
-        'Participação_minutos': 'sum',
-        'Duração_minutos': 'sum',
-        'Respondeu_Pesquisa': 'sum',
-        '% Câmera aberta': 'mean',
-        'Curso': 'first'
-    }).reset_index()
-    
-    time_series.columns = ['Data', 'Presentes', 'Total', 'Participacao_Total_Min', 'Duracao_Total_Min',
-                          'Pesquisas_Respondidas', 'Media_Camera', 'Curso']
-    time_series['Taxa_Presenca'] = (time_series['Presentes'] / time_series['Total'] * 100).round(2)
-    time_series['Taxa_Pesquisa'] = (time_series['Pesquisas_Respondidas'] / time_series['Presentes'].replace(0, 1) * 100).round(2)
-    time_series.loc[time_series['Presentes'] == 0, 'Taxa_Pesquisa'] = 0
-    # Média de participação = soma de participação / soma de duração * 100
-    time_series['Media_Participacao'] = (time_series['Participacao_Total_Min'] / time_series['Duracao_Total_Min'].replace(0, 1) * 100).round(2)
-    time_series.loc[time_series['Duracao_Total_Min'] == 0, 'Media_Participacao'] = 0
+def load_aggregates_streaming(csv_path=None, chunksize=100_000):
+    """Calcula as métricas agregadas lendo o CSV em blocos de tamanho limitado
     
-    return time_series
+    Apenas as somas parciais por diretor, curso e data ficam em memória, além
+    da máscara das linhas mantidas (ver _streaming_keep_mask). Retorna um
+    dicionário com 'summary', 'by_director', 'by_course', 'time_series' e 'sessions' nos mesmos formatos de
+    get_summary_metrics, get_metrics_by_director, get_metrics_by_course,
+    get_time_series_metrics e get_session_metrics, e 'sketches' com os
+    sketches de quantis de build_sketches.
+    """
+    if csv_path is None:
+        csv_path = find_data_file()
+    
+    por_diretor = None
+    por_curso = None
+    por_data = None
+    por_sessao = None
+    primeiro_curso = None
+    sketches = {}
+    totais = pd.Series(0.0, index=['Total', 'Presentes', 'Participacao_Total_Min',
+                                   'Duracao_Total_Min', 'Pesquisas_Respondidas',
+                                   'Camera_Soma', 'Camera_Contagem'])
+    
+    manter = _streaming_keep_mask(csv_path, chunksize)
+    
+    leitor = pd.read_csv(csv_path, sep=';', encoding='utf-8', usecols=AGGREGATE_COLUMNS, chunksize=chunksize)
+    inicio = 0
+    for chunk in leitor:
+        fim = inicio + len(chunk)
+        chunk = chunk[manter[inicio:fim]]
+        inicio = fim
+        if chunk.empty:
+            continue
+        chunk = process_raw_data(chunk, compact=False)
+        
+        por_diretor = _add_partials(por_diretor, partial_sums(chunk, 'Diretor'))
+        por_curso = _add_partials(por_curso, partial_sums(chunk, 'Curso'))
+        por_data = _add_partials(por_data, partial_sums(chunk, 'Data'))
+        por_sessao = _add_partials(por_sessao, partial_sums(chunk, SESSION_KEY))
+        
+        # Curso exibido na série temporal: primeira ocorrência de cada data
+        cursos = chunk.groupby('Data')['Curso'].first()
+        primeiro_curso = cursos if primeiro_curso is None else primeiro_curso.combine_first(cursos)
+        
+        # Distribuições em memória limitada: sketches do bloco combinados aos anteriores
+        sketches = merge_sketches(sketches, build_sketches(chunk))
+        
+        camera = chunk['% Câmera aberta']
+        totais += [len(chunk), chunk['Presente'].sum(), chunk['Participação_minutos'].sum(),
+                   chunk['Duração_minutos'].sum(), chunk['Respondeu_Pesquisa'].sum(),
+                   camera.sum(), camera.notna().sum()]
+    
+    if por_diretor is None:
+        return None
+    
+    summary = summary_from_totals(totais, total_cursos=len(por_curso), total_diretores=len(por_diretor))
+    
+    por_sessao = por_sessao.sort_index()
+    time_series = metrics_from_partials(por_data.sort_index(), round_camera=False)
+    time_series.insert(7, 'Curso', time_series['Data'].map(primeiro_curso))
+    sessoes = por_sessao.groupby(level='Data').size()
+    time_series.insert(8, 'Sessoes', time_series['Data'].map(sessoes).fillna(0).astype('int64'))
+    
+    return {
+        'summary': summary,
+        'by_director': metrics_from_partials(por_diretor),
+        'by_course': metrics_from_partials(por_curso),
+        'time_series': time_series,
+        'sessions': metrics_from_partials(por_sessao),
+        'sketches': sketches
+    }
+
+# Sketches de quantis: resumos de tamanho limitado das distribuições de
+# % Participação e % Câmera aberta que podem ser combinados entre arquivos
 
+class QuantileSketch:
+    """Sketch de quantis mesclável (estilo KLL) com memória limitada
+    
+    Os valores ficam em níveis; cada item do nível h representa 2**h valores.
+    Quando um nível passa da capacidade, ele é ordenado e metade dos itens
+    (alternados, a partir de uma posição sorteada) sobe para o nível
+    seguinte. Com k=200 o erro de posição dos quantis fica em torno de 1%.
+    Contagem, soma, soma dos quadrados, mínimo e máximo são exatos, então
+    média e desvio padrão também são.
+    """
+    
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+    
+    def _capacity(self, h):
+        return max(int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - h))), 2)
+    
+    def _compress(self):
+        compactou = True
+        while compactou:
+            compactou = False
+            for h, nivel in enumerate(self.levels):
+                if len(nivel) <= self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                nivel = np.sort(nivel)
+                # Com tamanho ímpar, o menor item fica no nível para o peso total não mudar
+                sobra = len(nivel) % 2
+                self.levels[h] = nivel[:sobra]
+                promovidos = nivel[sobra + self._rng.integers(2)::2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promovidos])
+                compactou = True
+    
+    def update(self, values):
+        """Acrescenta valores (nulos são ignorados) e retorna o próprio sketch"""
+        valores = np.asarray(values, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        self.count += len(valores)
+        self.total += float(valores.sum())
+        self.total_sq += float(np.square(valores).sum())
+        self.min = min(self.min, float(valores.min()))
+        self.max = max(self.max, float(valores.max()))
+        self.levels[0] = np.concatenate([self.levels[0], valores])
+        self._compress()
+        return self
+    
+    def merge(self, other):
+        """Novo sketch com os valores dos dois, sem revisitar as linhas"""
+        resultado = QuantileSketch(max(self.k, other.k))
+        n_niveis = max(len(self.levels), len(other.levels))
+        resultado.levels = [np.concatenate([a.levels[h] for a in (self, other) if h < len(a.levels)])
+                            for h in range(n_niveis)]
+        resultado.count = self.count + other.count
+        resultado.total = self.total + other.total
+        resultado.total_sq = self.total_sq + other.total_sq
+        resultado.min = min(self.min, other.min)
+        resultado.max = max(self.max, other.max)
+        resultado._compress()
+        return resultado
+    
+    def _items(self):
+        """Itens ordenados e o peso de cada um"""
+        itens = np.concatenate(self.levels)
+        pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(self.levels)])
+        ordem = np.argsort(itens, kind='stable')
+        return itens[ordem], pesos[ordem]
+    
+    def __len__(self):
+        return self.count
+    
+    @property
+    def size(self):
+        """Número de itens guardados (a memória do sketch)"""
+        return sum(len(nivel) for nivel in self.levels)
+    
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+    
+    @property
+    def std(self):
+        """Desvio padrão amostral (ddof=1, como pandas)"""
+        if self.count < 2:
+            return np.nan
+        variancia = (self.total_sq - self.total ** 2 / self.count) / (self.count - 1)
+        return float(np.sqrt(max(variancia, 0.0)))
+    
+    def quantile(self, q):
+        """Quantil(is) aproximado(s); q em [0, 1], escalar ou lista"""
+        escalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.count == 0:
+            resultado = np.full(len(q), np.nan)
+        else:
+            itens, pesos = self._items()
+            posicoes = np.searchsorted(np.cumsum(pesos), q * self.count, side='left')
+            resultado = itens[np.clip(posicoes, 0, len(itens) - 1)]
+            # Extremos são exatos
+            resultado = np.where(q <= 0, self.min, np.where(q >= 1, self.max, resultado))
+        return float(resultado[0]) if escalar else resultado
+    
+    def median(self):
+        return self.quantile(0.5)
+    
+    def cdf(self, x):
+        """Fração aproximada dos valores <= x"""
+        if self.count == 0:
+            return np.nan
+        itens, pesos = self._items()
+        return float(pesos[:np.searchsorted(itens, x, side='right')].sum() / self.count)
+    
+    def distribution(self, bins=20, value_range=None, label_format='{:.0f}-{:.0f}%'):
+        """Histograma aproximado no formato de utils.distribution (contagens arredondadas)"""
+        if self.count == 0:
+            return distribution([], bins, value_range, label_format)
+        itens, pesos = self._items()
+        faixa = value_range if value_range is not None else (self.min, self.max)
+        resultado = distribution(itens, bins, faixa, label_format, weights=pesos)
+        resultado['Contagem'] = resultado['Contagem'].round().astype(np.int64)
+        return resultado
+    
+    def to_dict(self):
+        return {'k': self.k, 'levels': [nivel.tolist() for nivel in self.levels], 'count': self.count,
+                'total': self.total, 'total_sq': self.total_sq,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None}
+    
+    @classmethod
+    def from_dict(cls, dados):
+        sketch = cls(dados['k'])
+        sketch.levels = [np.asarray(nivel, dtype=np.float64) for nivel in dados['levels']]
+        sketch.count = dados['count']
+        sketch.total = dados['total']
+        sketch.total_sq = dados['total_sq']
+        sketch.min = dados['min'] if dados['min'] is not None else np.inf
+        sketch.max = dados['max'] if dados['max'] is not None else -np.inf
+        return sketch
+
+# Medidas resumidas pelos sketches (apenas linhas de presentes, como no
+# panorama) e as dimensões em que cada uma é mantida
+SKETCH_COLUMNS = ['% Participação', '% Câmera aberta']
+SKETCH_DIMENSIONS = ['Curso', 'Diretor', 'Mes']
+
+def build_sketches(df, columns=SKETCH_COLUMNS, dimensions=SKETCH_DIMENSIONS, k=200):
+    """Sketches de quantis por medida, no total e por curso, diretor e mês
+    
+    Retorna um dicionário {(medida, dimensão, valor): QuantileSketch}; o total
+    usa a dimensão 'Total' e valor None, e os meses são textos 'AAAA-MM'.
+    """
+    presentes = df[df['Presente'] == 1]
+    grupos = {}
+    for dim in dimensions:
+        if dim == 'Mes':
+            # Agrupa por mês em datetime64[M] e formata só os rótulos distintos
+            meses = presentes['Data'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+            codes, labels = pd.factorize(meses, sort=True)
+            labels = pd.Index(labels.astype(str))
+        else:
+            codes, labels = _group_codes(presentes[dim])
+        # Linhas agrupadas por valor: uma fatia contígua por grupo
+        ordem = np.argsort(codes, kind='stable')
+        inicios = np.searchsorted(codes[ordem], np.arange(len(labels) + 1))
+        grupos[dim] = (labels, ordem, inicios)
+    
+    sketches = {}
+    for col in columns:
+        valores = presentes[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        sketches[(col, 'Total', None)] = QuantileSketch(k).update(valores)
+        for dim, (labels, ordem, inicios) in grupos.items():
+            for i, label in enumerate(labels):
+                if inicios[i] < inicios[i + 1]:
+                    sketches[(col, dim, label)] = QuantileSketch(k).update(valores[ordem[inicios[i]:inicios[i + 1]]])
+    return sketches
+
+def merge_sketches(*maps):
+    """Combina dicionários de build_sketches (por exemplo, de arquivos diferentes)"""
+    resultado = {}
+    for sketches in maps:
+        for chave, sketch in (sketches or {}).items():
+            resultado[chave] = resultado[chave].merge(sketch) if chave in resultado else sketch
+    return resultado
+
+def _sketch_cache_path(csv_path):
+    _, meta_path = _cache_paths(csv_path)
+    return meta_path.with_name(f'{Path(csv_path).name}.sketches.json')
+
+def load_sketches(csv_path=None, use_cache=True):
+    """Sketches de um CSV, guardados em .cache junto do cache Parquet
+    
+    O arquivo de sketches só é reaproveitado enquanto o cache Parquet for
+    válido para o CSV e tiver o mesmo hash de conteúdo.
+    """
+    if csv_path is None:
+        csv_path = find_data_file()
+    sketch_path = _sketch_cache_path(csv_path)
+    _, meta_path = _cache_paths(csv_path)
+    
+    if use_cache and valid_cache_path(csv_path) is not None and sketch_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            dados = json.loads(sketch_path.read_text(encoding='utf-8'))
+            if dados.get('sha256') == meta.get('sha256'):
+                return {tuple(item['key']): QuantileSketch.from_dict(item['sketch']) for item in dados['sketches']}
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    sketches = build_sketches(load_data(csv_path, use_cache=use_cache))
+    if use_cache:
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            dados = {'sha256': meta['sha256'],
+                     'sketches': [{'key': list(chave), 'sketch': sketch.to_dict()} for chave, sketch in sketches.items()]}
+            sketch_path.write_text(json.dumps(dados), encoding='utf-8')
+        except (OSError, ValueError, KeyError):
+            pass
+    return sketches
+
+def load_dataset_sketches(directory=None, pattern='base_dados_cursos*.csv', use_cache=True):
+    """Sketches de todos os snapshots mensais, combinados sem reler as linhas
+    
+    Cada arquivo tem seus sketches em cache; registros repetidos em mais de
+    um snapshot entram uma vez por arquivo (não há remoção de duplicatas).
+    """
+    return merge_sketches(*(load_sketches(path, use_cache=use_cache)
+                            for path in find_dataset_files(directory, pattern)))
+
+# Armazenamento opcional em SQLite: uma linha por registro já processado, com
+# índices nas colunas usadas pelos filtros da sidebar
+SQLITE_TABLE = 'registros'
+SQLITE_COLUMNS = [
+    ('Data', 'TEXT'),
+    ('Participante', 'TEXT'),
+    ('Diretor', 'TEXT'),
+    ('Curso', 'TEXT'),
+    ('Duração', 'TEXT'),
+    ('Participação', 'TEXT'),
+    ('% Participação', 'REAL'),
+    ('% Câmera aberta', 'REAL'),
+    ('Respondeu a Pesquisa de Satisfação?', 'TEXT'),
+    ('Status', 'TEXT'),
+    ('Motivo Ausência', 'TEXT'),
+    ('Participação_minutos', 'REAL'),
+    ('Duração_minutos', 'REAL'),
+    ('Respondeu_Pesquisa', 'INTEGER'),
+    ('Presente', 'INTEGER')
+]
+SQLITE_INDEXED = ['Data', 'Curso', 'Diretor', 'Participante']
+
+def _quote(col):
+    """Escapa o nome de uma coluna para uso em SQL"""
+    return '"' + col.replace('"', '""') + '"'
+
+def sqlite_connect(db_path):
+    """Abre o banco SQLite, criando a tabela e os índices se necessário"""
+    conn = sqlite3.connect(db_path)
+    colunas = ', '.join(f'{_quote(c)} {t}' for c, t in SQLITE_COLUMNS)
+    chave = ', '.join(_quote(c) for c in RECORD_KEY)
+    with conn:
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} ({colunas}, UNIQUE ({chave}))')
+        for col in SQLITE_INDEXED:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{SQLITE_TABLE}_{col.lower()} '
+                         f'ON {SQLITE_TABLE} ({_quote(col)})')
+    return conn
+
+def sqlite_append(db_path, df):
+    """Grava registros processados no SQLite em uma única transação
+    
+    Registros com a mesma chave (Data, Participante, Curso) são substituídos
+    pela versão nova e linhas com chave incompleta são ignoradas, como em
+    drop_duplicate_records. Retorna o número de linhas gravadas.
+    """
+    df = df[complete_key(df)]
+    colunas = [c for c, _ in SQLITE_COLUMNS]
+    dados = df.reindex(columns=colunas).astype(object)
+    dados['Data'] = df['Data'].dt.strftime('%Y-%m-%d')
+    dados = dados.astype(object).where(dados.notna(), None)
+    
+    marcadores = ', '.join('?' for _ in colunas)
+    sql = f'INSERT OR REPLACE INTO {SQLITE_TABLE} ({", ".join(_quote(c) for c in colunas)}) VALUES ({marcadores})'
+    conn = sqlite_connect(db_path)
+    try:
+        with conn:
+            conn.executemany(sql, dados.itertuples(index=False, name=None))
+    finally:
+        conn.close()
+    return len(dados)
+
+def import_csv_to_sqlite(csv_path, db_path):
+    """Processa o CSV e grava todos os registros no SQLite"""
+    return sqlite_append(db_path, load_data(csv_path))
+
+def _sqlite_where(date_range=None, cursos=None, diretores=None):
+    """Monta a cláusula WHERE e os parâmetros para os filtros da sidebar"""
+    condicoes = []
+    params = []
+    if date_range is not None:
+        inicio, fim = date_range
+        condicoes.append(f'{_quote("Data")} BETWEEN ? AND ?')
+        params += [pd.Timestamp(inicio).strftime('%Y-%m-%d'), pd.Timestamp(fim).strftime('%Y-%m-%d')]
+    for col, valores in (('Curso', cursos), ('Diretor', diretores)):
+        if valores is None:
+            continue
+        if isinstance(valores, str):
+            valores = [valores]
+        condicoes.append(f'{_quote(col)} IN ({", ".join("?" for _ in valores)})')
+        params += list(valores)
+    where = ('WHERE ' + ' AND '.join(condicoes)) if condicoes else ''
+    return where, params
+
+def load_data_sqlite(db_path, date_range=None, cursos=None, diretores=None, columns=None):
+    """Carrega do SQLite apenas os registros que atendem aos filtros
+    
+    date_range é um par (início, fim) inclusivo; cursos e diretores aceitam
+    um valor ou uma lista. O resultado tem o mesmo formato de load_data.
+    """
+    where, params = _sqlite_where(date_range, cursos, diretores)
+    colunas = ', '.join(_quote(c) for c in (columns or [c for c, _ in SQLITE_COLUMNS]))
+    conn = sqlite_connect(db_path)
+    try:
+        df = pd.read_sql_query(f'SELECT {colunas} FROM {SQLITE_TABLE} {where} ORDER BY rowid', conn, params=params)
+    finally:
+        conn.close()
+    if 'Data' in df.columns:
+        df['Data'] = pd.to_datetime(df['Data'], format='%Y-%m-%d')
+    return apply_schema(df)
+
+_SQLITE_SUMS = f"""
+    SUM({_quote('Presente')}) AS Presentes,
+    COUNT(*) AS Total,
+    SUM({_quote('Participação_minutos')}) AS Participacao_Total_Min,
+    SUM({_quote('Duração_minutos')}) AS Duracao_Total_Min,
+    SUM({_quote('Respondeu_Pesquisa')}) AS Pesquisas_Respondidas,
+    COALESCE(SUM({_quote('% Câmera aberta')}), 0) AS Camera_Soma,
+    COUNT({_quote('% Câmera aberta')}) AS Camera_Contagem
+"""
+
+def get_aggregates_sqlite(db_path, date_range=None, cursos=None, diretores=None):
+    """Calcula as métricas agregadas dentro do SQLite, com os filtros nos índices
+    
+    Retorna o mesmo dicionário de load_aggregates_streaming: 'summary',
+    'by_director', 'by_course', 'time_series' e 'sessions' (sem 'sketches').
+    """
+    where, params = _sqlite_where(date_range, cursos, diretores)
+    conn = sqlite_connect(db_path)
+    try:
+        def por_chave(col, extra=''):
+            filtro = f'{where} AND' if where else 'WHERE'
+            sql = (f'SELECT {_quote(col)} AS {_quote(col)}, {_SQLITE_SUMS}{extra} FROM {SQLITE_TABLE} '
+                   f'{filtro} {_quote(col)} IS NOT NULL GROUP BY {_quote(col)} ORDER BY {_quote(col)}')
+            return pd.read_sql_query(sql, conn, params=params).set_index(col)
+        
+        por_diretor = por_chave('Diretor')
+        por_curso = por_chave('Curso')
+        por_data = por_chave('Data', f', COUNT(DISTINCT {_quote("Curso")}) AS Sessoes')
+        filtro = f'{where} AND' if where else 'WHERE'
+        # Curso exibido na série temporal: primeira linha da data com Curso preenchido
+        primeiro_curso = pd.read_sql_query(
+            f'SELECT {_quote("Data")}, {_quote("Curso")} FROM {SQLITE_TABLE} WHERE rowid IN '
+            f'(SELECT MIN(rowid) FROM {SQLITE_TABLE} {filtro} {_quote("Data")} IS NOT NULL '
+            f'AND {_quote("Curso")} IS NOT NULL GROUP BY {_quote("Data")})',
+            conn, params=params).set_index('Data')['Curso']
+        chave = ', '.join(_quote(col) for col in SESSION_KEY)
+        por_sessao = pd.read_sql_query(
+            f'SELECT {chave}, {_SQLITE_SUMS} FROM {SQLITE_TABLE} {filtro} {_quote("Data")} IS NOT NULL '
+            f'AND {_quote("Curso")} IS NOT NULL GROUP BY {chave} ORDER BY {chave}', conn, params=params)
+        totais = pd.read_sql_query(f'SELECT {_SQLITE_SUMS} FROM {SQLITE_TABLE} {where}', conn, params=params).iloc[0].fillna(0)
+    finally:
+        conn.close()
+    
+    sessoes = por_data.pop('Sessoes')
+    primeiro_curso = por_data.index.map(primeiro_curso)
+    por_data.index = pd.to_datetime(por_data.index, format='%Y-%m-%d')
+    time_series = metrics_from_partials(por_data, round_camera=False)
+    time_series.insert(7, 'Curso', np.asarray(primeiro_curso, dtype=object))
+    time_series.insert(8, 'Sessoes', sessoes.to_numpy())
+    por_sessao['Data'] = pd.to_datetime(por_sessao['Data'], format='%Y-%m-%d')
+    
+    return {
+        'summary': summary_from_totals(totais, total_cursos=len(por_curso), total_diretores=len(por_diretor)),
+        'by_director': metrics_from_partials(por_diretor),
+        'by_course': metrics_from_partials(por_curso),
+        'time_series': time_series,
+        'sessions': metrics_from_partials(por_sessao.set_index(SESSION_KEY))
+    }